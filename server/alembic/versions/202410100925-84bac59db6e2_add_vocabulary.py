@@ -9,9 +9,8 @@ Create Date: 2024-10-10 09:25:57.916215
 from collections.abc import Sequence
 
 from alembic import op
-from models.vocab import Vocabulary
-from sqlalchemy import orm
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import text
+from src.vocab_import import STAGING, stage_words
 
 # revision identifiers, used by Alembic.
 revision: str = "84bac59db6e2"
@@ -21,21 +20,19 @@ depends_on: str | Sequence[str] | None = None
 
 
 def upgrade() -> None:
+    # one COPY instead of one INSERT per word; the vocabularies table of this revision has no
+    # ordinal or weight yet, so only word and length are inserted
     bind = op.get_bind()
-    session = orm.Session(bind=bind)
-
     with open("alembic/vocab/words.txt") as f:
-        for line in f:
-            word = line.strip().lower()
-            if len(word) > 0:
-                session.execute(
-                    insert(Vocabulary)
-                    .values(word=word, length=len(word))
-                    .on_conflict_do_update(
-                        index_elements=[Vocabulary.word], set_={"length": len(word)}
-                    )
-                )
-    session.commit()
+        stage_words(bind, f)
+    bind.execute(
+        text(
+            f"INSERT INTO vocabularies (word, length)"
+            f" SELECT DISTINCT word, length(word) FROM {STAGING}"
+            f" ON CONFLICT (word) DO UPDATE SET length = excluded.length"
+        )
+    )
+    bind.execute(text(f"DROP TABLE {STAGING}"))
 
 
 def downgrade() -> None:
@@ -0,0 +1,27 @@
+"""Store host_rule on Game
+
+Revision ID: 3c9e1f7a2b64
+Revises: 0a54279ceabe
+Create Date: 2026-10-18 10:30:12.418203
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "3c9e1f7a2b64"
+down_revision: str | None = "0a54279ceabe"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "games", sa.Column("host_rule", sa.String, nullable=False, server_default="cheating")
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("games", "host_rule")
@@ -0,0 +1,94 @@
+"""Pack candidate sets
+
+Revision ID: 9d2f4b61c8e7
+Revises: 3c9e1f7a2b64
+Create Date: 2026-10-18 11:45:03.512871
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import orm, text
+from src.candidate_codec import pack_words, unpack_words
+from src.word_mask import WordTable
+
+revision: str = "9d2f4b61c8e7"
+down_revision: str | None = "3c9e1f7a2b64"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TABLES = ["games", "game_history"]
+SELECT_PACKED = {
+    "games": "SELECT id, answer, word_length FROM games",
+    "game_history": (
+        "SELECT h.id, h.answer, g.word_length FROM game_history h JOIN games g ON g.id = h.game_id"
+    ),
+}
+
+
+def load_word_tables(session: orm.Session) -> dict[int, WordTable]:
+    vocabulary: dict[int, list[str]] = {}
+    rows = session.execute(text("SELECT length, word FROM vocabularies ORDER BY length, ordinal"))
+    for length, word in rows:
+        vocabulary.setdefault(length, []).append(word)
+    return {length: WordTable(length, words) for length, words in vocabulary.items()}
+
+
+def get_word_table(tables: dict[int, WordTable], length: int) -> WordTable:
+    if length not in tables:
+        tables[length] = WordTable(length)
+    return tables[length]
+
+
+def upgrade() -> None:
+    op.add_column("vocabularies", sa.Column("ordinal", sa.Integer))
+    op.execute(
+        "UPDATE vocabularies SET ordinal = o.ordinal FROM ("
+        "  SELECT id, row_number() OVER (PARTITION BY length ORDER BY word) - 1 AS ordinal"
+        "  FROM vocabularies"
+        ") o WHERE vocabularies.id = o.id"
+    )
+    op.alter_column("vocabularies", "ordinal", nullable=False)
+    op.create_index(
+        "ix_vocabularies_length_ordinal", "vocabularies", ["length", "ordinal"], unique=True
+    )
+
+    bind = op.get_bind()
+    session = orm.Session(bind=bind)
+    tables = load_word_tables(session)
+    for name in TABLES:
+        op.add_column(name, sa.Column("packed_answer", sa.LargeBinary))
+        rows = session.execute(text(f"SELECT id, answer FROM {name}")).fetchall()
+        for row in rows:
+            words = row.answer.split(",")
+            packed = pack_words(get_word_table(tables, len(words[0])), words)
+            session.execute(
+                text(f"UPDATE {name} SET packed_answer=:packed WHERE id=:id"),
+                {"packed": packed, "id": row.id},
+            )
+        session.commit()
+        op.drop_column(name, "answer")
+        op.alter_column(name, "packed_answer", new_column_name="answer", nullable=False)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    session = orm.Session(bind=bind)
+    tables = load_word_tables(session)
+    for name in TABLES:
+        op.add_column(name, sa.Column("text_answer", sa.String))
+        rows = session.execute(text(SELECT_PACKED[name])).fetchall()
+        for row in rows:
+            words = unpack_words(get_word_table(tables, row.word_length), row.answer)
+            session.execute(
+                text(f"UPDATE {name} SET text_answer=:answer WHERE id=:id"),
+                {"answer": ",".join(words), "id": row.id},
+            )
+        session.commit()
+        op.drop_column(name, "answer")
+        op.alter_column(name, "text_answer", new_column_name="answer", nullable=False)
+
+    op.drop_index("ix_vocabularies_length_ordinal", "vocabularies")
+    op.drop_column("vocabularies", "ordinal")
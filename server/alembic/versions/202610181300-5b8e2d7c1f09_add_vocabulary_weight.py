@@ -0,0 +1,25 @@
+"""Add weight on Vocabulary
+
+Revision ID: 5b8e2d7c1f09
+Revises: 9d2f4b61c8e7
+Create Date: 2026-10-18 13:00:41.207315
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "5b8e2d7c1f09"
+down_revision: str | None = "9d2f4b61c8e7"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("vocabularies", sa.Column("weight", sa.Float, nullable=False, server_default="1"))
+
+
+def downgrade() -> None:
+    op.drop_column("vocabularies", "weight")
@@ -0,0 +1,39 @@
+"""Order GameHistory by attempt
+
+Revision ID: e4a7c3d95b21
+Revises: 5b8e2d7c1f09
+Create Date: 2026-10-18 15:00:27.903114
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "e4a7c3d95b21"
+down_revision: str | None = "5b8e2d7c1f09"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("game_history", sa.Column("attempt", sa.Integer))
+    op.execute(
+        "UPDATE game_history SET attempt = o.attempt FROM ("
+        "  SELECT id, row_number() OVER (PARTITION BY game_id ORDER BY created_at, id) AS attempt"
+        "  FROM game_history"
+        ") o WHERE game_history.id = o.id"
+    )
+    op.alter_column("game_history", "attempt", nullable=False)
+    # (game_id, attempt) also serves the lookups by game_id alone
+    op.create_index(
+        "ix_game_history_game_id_attempt", "game_history", ["game_id", "attempt"], unique=True
+    )
+    op.drop_index("ix_game_history_game_id", "game_history")
+
+
+def downgrade() -> None:
+    op.create_index("ix_game_history_game_id", "game_history", ["game_id"])
+    op.drop_index("ix_game_history_game_id_attempt", "game_history")
+    op.drop_column("game_history", "attempt")
@@ -0,0 +1,27 @@
+"""Add vocabulary_version sequence
+
+Revision ID: 7c2e5a9f4d13
+Revises: e4a7c3d95b21
+Create Date: 2026-10-18 17:00:12.408816
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "7c2e5a9f4d13"
+down_revision: str | None = "e4a7c3d95b21"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence("vocabulary_version")))
+    # last_value reads 1 both before and after the first nextval, so start from a called sequence
+    op.execute("SELECT nextval('vocabulary_version')")
+
+
+def downgrade() -> None:
+    op.execute(sa.schema.DropSequence(sa.Sequence("vocabulary_version")))
@@ -6,6 +6,85 @@ DB_URL = os.environ.get("POSTGRES_URL")
 DEFAULT_MAX_ATTEMPTS = os.environ.get("MAX_ATTEMPTS", 6)
 DEFAULT_LEN_WORD = os.environ.get("LEN_WORD", 5)
 
+# logging, see middleware/custom_logging.py
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+# per-logger levels, e.g. "src.game_guess=DEBUG,sqlalchemy.engine=INFO"
+LOG_LEVELS = os.environ.get("LOG_LEVELS", "")
+# fraction of the high-volume debug records that are kept
+LOG_SAMPLE_RATE = float(os.environ.get("LOG_SAMPLE_RATE", 0.01))
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", 10_000))
+
+# /metrics, see src/metrics.py. METRICS_DIR is shared by the workers of one server
+METRICS_DIR = os.environ.get("METRICS_DIR", "")
+METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", 5))
+
+# requests slower than this are traced to logs/wordleserver-slow.log, see middleware/timing.py
+SLOW_REQUEST_MS = float(os.environ.get("SLOW_REQUEST_MS", 500))
+
+# schema migrations at worker startup: upgrade, check or skip, see models/migration.py
+DB_MIGRATE = os.environ.get("DB_MIGRATE", "check")
+# seconds a worker may keep failing to load its caches before /health/live fails
+WARM_UP_TIMEOUT = float(os.environ.get("WARM_UP_TIMEOUT", 300))
+
+# seconds between checks of `vocabulary_version`, after which a worker reloads a changed vocabulary
+VOCABULARY_CHECK_SECONDS = float(os.environ.get("VOCABULARY_CHECK_SECONDS", 30))
+# bearer token of the admin endpoints (POST /vocabulary/reload), which are disabled when empty
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+
+# import time budget of the server package, enforced by src/test_startup_profile.py
+STARTUP_IMPORT_BUDGET_MS = float(os.environ.get("STARTUP_IMPORT_BUDGET_MS", 3000))
+
+# database connection pool per worker process, see models/session.py
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "false").lower() == "true"
+DB_STATEMENT_CACHE_SIZE = int(os.environ.get("DB_STATEMENT_CACHE_SIZE", 100))
+# application_name of server connections, src/vocab_import.py only prunes while there are none
+DB_APPLICATION_NAME = os.environ.get("DB_APPLICATION_NAME", "wordle-server")
+
+# game history writes: sync, group or async, see models/history_writer.py
+HISTORY_WRITE_MODE = os.environ.get("HISTORY_WRITE_MODE", "sync")
+HISTORY_FLUSH_MS = int(os.environ.get("HISTORY_FLUSH_MS", 50))
+HISTORY_FLUSH_ROWS = int(os.environ.get("HISTORY_FLUSH_ROWS", 100))
+# failed flushes an "async" row is retried in before it is dropped
+HISTORY_FLUSH_RETRIES = int(os.environ.get("HISTORY_FLUSH_RETRIES", 100))
+
+# cache of in-progress games: local or none, see models/game_state.py
+GAME_CACHE_BACKEND = os.environ.get("GAME_CACHE_BACKEND", "local")
+GAME_CACHE_ENTRIES = int(os.environ.get("GAME_CACHE_ENTRIES", 10_000))
+GAME_CACHE_TTL = float(os.environ.get("GAME_CACHE_TTL", 900))
+
+# precomputed guess x answer feedback matrices, see src/feedback_matrix.py
+FEEDBACK_MATRIX_DIR = os.environ.get("FEEDBACK_MATRIX_DIR", "data/feedback")
+FEEDBACK_MATRIX_MAX_BYTES = int(os.environ.get("FEEDBACK_MATRIX_MAX_BYTES", 256 * 1024 * 1024))
+
+# process-wide hint caches, see src/hint_cache.py
+HINT_CACHE_PAIRS = int(os.environ.get("HINT_CACHE_PAIRS", 100_000))
+HINT_CACHE_ROWS = int(os.environ.get("HINT_CACHE_ROWS", 1024))
+HINT_CACHE_MAX_BYTES = int(os.environ.get("HINT_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+HINT_CACHE_EVICTION = os.environ.get("HINT_CACHE_EVICTION", "lru")
+
+# memoized host decisions, see src/transposition.py
+TRANSPOSITION_ENTRIES = int(os.environ.get("TRANSPOSITION_ENTRIES", 10_000))
+TRANSPOSITION_MAX_BYTES = int(os.environ.get("TRANSPOSITION_MAX_BYTES", 64 * 1024 * 1024))
+
+# where host rules run: inline, thread or process, see src/executor.py
+HOST_EXECUTOR = os.environ.get("HOST_EXECUTOR", "thread")
+HOST_EXECUTOR_WORKERS = int(os.environ.get("HOST_EXECUTOR_WORKERS", os.cpu_count() or 1))
+HOST_EXECUTOR_TIMEOUT = float(os.environ.get("HOST_EXECUTOR_TIMEOUT", 5.0))
+HOST_EXECUTOR_INLINE_BELOW = int(os.environ.get("HOST_EXECUTOR_INLINE_BELOW", 1000))
+# how "process" workers start: forkserver or spawn, never a fork of the threaded server
+HOST_EXECUTOR_START_METHOD = os.environ.get("HOST_EXECUTOR_START_METHOD", "forkserver")
+
+# parallel filtering of large candidate pools, see src/shard.py
+SHARD_WORKERS = int(os.environ.get("SHARD_WORKERS", os.cpu_count() or 1))
+SHARD_MIN_SIZE = int(os.environ.get("SHARD_MIN_SIZE", 4096))
+
+# bucket choice of the "bucket" host rule: largest, lowest_score or random
+BUCKET_POLICY = os.environ.get("BUCKET_POLICY", "largest")
+
 DEFAULT_WORD_LIST = os.environ.get("WORD_LIST")
 if DEFAULT_WORD_LIST:
     DEFAULT_WORD_LIST = DEFAULT_WORD_LIST.split(",")
@@ -27,3 +106,14 @@ class Hint(enum.Enum):
     HIT = "0"
     PRESENT = "?"
     MISS = "_"
+
+
+class HostRule(enum.Enum):
+    CHEATING = "cheating"
+    BUCKET = "bucket"
+
+
+class BucketPolicy(enum.Enum):
+    LARGEST = "largest"
+    LOWEST_SCORE = "lowest_score"
+    RANDOM = "random"
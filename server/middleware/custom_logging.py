@@ -1,9 +1,118 @@
 # logging config for uvicorn into console and rotating log file in logs folder
+# Handlers run on a listener thread behind a queue, so a request never waits on console or file
+# I/O: records are put on the queue unformatted, and dropped and counted when the queue is full.
+# Levels are set per logger by LOG_LEVEL and LOG_LEVELS. Debug records logged with
+# `extra=SAMPLED`, e.g. whole candidate lists, are kept at LOG_SAMPLE_RATE.
+import atexit
+import logging
+import logging.config
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
+from config import LOG_LEVEL, LOG_LEVELS, LOG_QUEUE_SIZE, LOG_SAMPLE_RATE
+
+SAMPLED = {"sampled": True}
+QUEUED_LOGGERS = ("root", "uvicorn.error", "slow_request")
+
+_listeners: list[QueueListener] = []
+
+
+def parse_levels(spec: str) -> dict[str, str]:
+    """Levels by logger name from "name=LEVEL,name=LEVEL"."""
+    levels = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, level = item.partition("=")
+        if not level.strip():
+            raise ValueError(f"Expected logger=LEVEL, got {item.strip()!r}")
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a `rate` fraction of the records logged with `extra=SAMPLED`, pass all others."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False) or random.random() < self.rate:
+            return True
+        self.dropped += 1
+        return False
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Queue handler that neither formats nor waits in the logging thread."""
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # formatted by the listener, log copies rather than lists that are still being modified
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def enqueue_handlers(logger: logging.Logger, size: int = LOG_QUEUE_SIZE) -> QueueListener | None:
+    """Move the handlers of `logger` behind a queue drained by a listener thread."""
+    handlers = [h for h in logger.handlers if not isinstance(h, QueueHandler)]
+    if not handlers:
+        return None
+    handler = NonBlockingQueueHandler(queue.Queue(size))
+    handler.addFilter(SamplingFilter(LOG_SAMPLE_RATE))
+    for h in handlers:
+        logger.removeHandler(h)
+    logger.addHandler(handler)
+    listener = QueueListener(handler.queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+    return listener
+
+
+def stop_logging() -> None:
+    """Write out everything still queued."""
+    while _listeners:
+        _listeners.pop().stop()
+
 
 def setup_logging() -> None:
     Path("logs").mkdir(exist_ok=True)
+    root = logging.getLogger()
+    # uvicorn has already applied `logger_config` when it runs the server
+    if not root.handlers:
+        logging.config.dictConfig(logger_config)
+    root.setLevel(LOG_LEVEL)
+    for name, level in parse_levels(LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+    for name in QUEUED_LOGGERS:
+        enqueue_handlers(logging.getLogger(name))
+
+
+def logging_stats() -> dict[str, int]:
+    dropped = {"queue_full": 0, "sampled": 0}
+    for name in QUEUED_LOGGERS:
+        for handler in logging.getLogger(name).handlers:
+            if isinstance(handler, NonBlockingQueueHandler):
+                dropped["queue_full"] += handler.dropped
+                dropped["sampled"] += sum(
+                    f.dropped for f in handler.filters if isinstance(f, SamplingFilter)
+                )
+    return dropped
+
+
+atexit.register(stop_logging)
 
 
 logger_config = {
@@ -42,6 +151,14 @@ logger_config = {
             "backupCount": 10,
             "encoding": "utf8",
         },
+        "slow": {
+            "formatter": "file",
+            "class": "logging.handlers.TimedRotatingFileHandler",
+            "filename": "logs/wordleserver-slow.log",
+            "when": "D",
+            "backupCount": 10,
+            "encoding": "utf8",
+        },
         "error": {
             "formatter": "file",
             "class": "logging.handlers.TimedRotatingFileHandler",
@@ -52,7 +169,8 @@ logger_config = {
         },
     },
     "loggers": {
-        "root": {"handlers": ["default", "file"], "level": "DEBUG", "propagate": False},
+        "slow_request": {"handlers": ["slow"], "level": "INFO", "propagate": False},
+        "root": {"handlers": ["default", "file"], "level": LOG_LEVEL, "propagate": False},
         # "uvicorn": {
         #     "handlers": ["default", "file"],
         #     "level": "DEBUG",
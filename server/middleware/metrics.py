@@ -0,0 +1,77 @@
+# Request metrics for /metrics: latency and status per route, and the SQL statements each request
+# ran, counted through SQLAlchemy cursor events. See src/metrics.py for the registry.
+import time
+from contextvars import ContextVar
+
+from middleware.timing import record
+from sqlalchemy import Engine, event
+from src.metrics import (
+    db_queries,
+    db_query_seconds,
+    db_request_seconds,
+    http_request_seconds,
+    http_requests,
+)
+
+# [statements, seconds] of the current request
+_request_db: ContextVar[list | None] = ContextVar("request_db", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_metrics_start", None)
+    if start is None:
+        return
+    seconds = time.perf_counter() - start
+    db_query_seconds.observe(seconds)
+    record("db", seconds, statement[:200])
+    totals = _request_db.get()
+    if totals is not None:
+        totals[0] += 1
+        totals[1] += seconds
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time the statements of `engine`, the `sync_engine` of an async engine."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and SQL statements per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        totals = [0, 0.0]
+        token = _request_db.set(totals)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            seconds = time.perf_counter() - start
+            _request_db.reset(token)
+            # the template, e.g. /v1/{id}, set by the router; unmatched paths share one label
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            http_requests.inc(method, route, str(status))
+            http_request_seconds.observe(seconds, method, route)
+            db_queries.observe(totals[0], route)
+            db_request_seconds.observe(totals[1], route)
@@ -0,0 +1,70 @@
+import logging
+import queue
+
+import pytest
+from middleware.custom_logging import (
+    SAMPLED,
+    NonBlockingQueueHandler,
+    SamplingFilter,
+    enqueue_handlers,
+    parse_levels,
+    stop_logging,
+)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+
+
+def record(sampled: bool = False) -> logging.LogRecord:
+    r = logging.LogRecord("test", logging.DEBUG, __file__, 1, "%s", ("x",), None)
+    if sampled:
+        r.__dict__.update(SAMPLED)
+    return r
+
+
+def test_parse_levels():
+    assert parse_levels("") == {}
+    assert parse_levels("src.game_guess=debug, sqlalchemy.engine=INFO") == {
+        "src.game_guess": "DEBUG",
+        "sqlalchemy.engine": "INFO",
+    }
+    with pytest.raises(ValueError):
+        parse_levels("src.game_guess")
+
+
+def test_sampling_filter():
+    assert SamplingFilter(0).filter(record())
+    drop_all = SamplingFilter(0)
+    assert not drop_all.filter(record(sampled=True))
+    assert drop_all.dropped == 1
+    assert SamplingFilter(1).filter(record(sampled=True))
+
+
+def test_enqueue_handlers():
+    logger = logging.getLogger("test_enqueue_handlers")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    target = ListHandler()
+    logger.addHandler(target)
+    assert enqueue_handlers(logger) is not None
+    try:
+        assert [type(h) for h in logger.handlers] == [NonBlockingQueueHandler]
+        # already behind a queue
+        assert enqueue_handlers(logger) is None
+        logger.debug("candidates=%s", ["crazy"])
+    finally:
+        stop_logging()
+    assert target.messages == ["candidates=['crazy']"]
+
+
+def test_queue_full_drops():
+    handler = NonBlockingQueueHandler(queue.Queue(1))
+    handler.handle(record())
+    handler.handle(record())
+    assert handler.dropped == 1
@@ -0,0 +1,44 @@
+import asyncio
+
+import sqlalchemy as sa
+from middleware.metrics import MetricsMiddleware, _request_db, instrument_engine
+from src.metrics import db_query_seconds, http_request_seconds, http_requests
+
+
+class Route:
+    path = "/v1/{id}"
+
+
+async def endpoint(scope, receive, send):
+    scope["route"] = Route()
+    await send({"type": "http.response.start", "status": 404, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def test_middleware_records_route_and_status():
+    before = http_requests.snapshot().get(("GET", "/v1/{id}", "404"), 0)
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(MetricsMiddleware(endpoint)({"type": "http", "method": "GET"}, None, send))
+    assert len(sent) == 2
+    assert http_requests.snapshot()[("GET", "/v1/{id}", "404")] == before + 1
+    assert ("GET", "/v1/{id}") in http_request_seconds.snapshot()
+
+
+def test_instrument_engine():
+    engine = sa.create_engine("sqlite://")
+    instrument_engine(engine)
+    before = sum(db_query_seconds.snapshot().get((), [0])[:-1])
+    totals = [0, 0.0]
+    token = _request_db.set(totals)
+    try:
+        with engine.connect() as conn:
+            conn.execute(sa.text("SELECT 1"))
+            conn.execute(sa.text("SELECT 2"))
+    finally:
+        _request_db.reset(token)
+    assert totals[0] == 2
+    assert sum(db_query_seconds.snapshot()[()][:-1]) == before + 2
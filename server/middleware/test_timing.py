@@ -0,0 +1,56 @@
+import asyncio
+import json
+import logging
+
+from middleware.timing import RequestTimer, TimingMiddleware, phase, record
+
+
+def test_phase_outside_request():
+    with phase("game"):
+        pass
+    record("db", 0.1)
+
+
+def test_server_timing():
+    timer = RequestTimer()
+    timer.record("db", 0.002)
+    timer.record("db", 0.001)
+    timer.record("host", 0.0105)
+    assert timer.server_timing(0.02) == (
+        'db;dur=3.000;desc="2x", host;dur=10.500, total;dur=20.000'
+    )
+    assert [event["phase"] for event in timer.trace()] == ["db", "db", "host"]
+
+
+def run(app, slow_ms):
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/v1/submit", "query_string": b"guess=crazy"}
+    asyncio.run(TimingMiddleware(app, slow_ms)(scope, None, send))
+    return sent
+
+
+async def endpoint(scope, receive, send):
+    with phase("game"):
+        record("db", 0.001, "SELECT 1")
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def test_middleware_header():
+    start = run(endpoint, slow_ms=60_000)[0]
+    header = dict(start["headers"])[b"server-timing"].decode()
+    names = [entry.split(";")[0] for entry in header.split(", ")]
+    assert names == ["db", "game", "total"]
+
+
+def test_slow_request_trace(caplog):
+    with caplog.at_level(logging.WARNING, logger="slow_request"):
+        run(endpoint, slow_ms=0)
+    trace = json.loads(caplog.records[-1].getMessage())
+    assert trace["path"] == "/v1/submit"
+    assert trace["status"] == 200
+    assert [(e["phase"], e["detail"]) for e in trace["trace"]] == [("db", "SELECT 1"), ("game", "")]
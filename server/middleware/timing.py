@@ -0,0 +1,120 @@
+# Request-scoped phase timing. Code on the request path wraps its steps in `phase(name)`, or reports
+# a duration measured elsewhere (another thread, a SQL event) with `record(name, seconds)`.
+# TimingMiddleware returns the per-phase totals in a Server-Timing header, and writes the full
+# trace of every phase and SQL statement to the "slow_request" logger when a request takes longer
+# than SLOW_REQUEST_MS. Outside a request both functions do nothing.
+import contextlib
+import json
+import logging
+import time
+from collections.abc import Iterator
+from contextvars import ContextVar
+
+from config import SLOW_REQUEST_MS
+
+slow_log = logging.getLogger("slow_request")
+
+# events kept for the slow-request trace, totals are always complete
+MAX_TRACE_EVENTS = 200
+
+
+class RequestTimer:
+    def __init__(self):
+        self.start = time.perf_counter()
+        # name -> [seconds, count]
+        self.phases: dict[str, list] = {}
+        # (name, offset, seconds, detail) in the order the phases ended
+        self.events: list[tuple[str, float, float, str]] = []
+
+    def record(self, name: str, seconds: float, detail: str = "", start: float | None = None):
+        totals = self.phases.setdefault(name, [0.0, 0])
+        totals[0] += seconds
+        totals[1] += 1
+        if len(self.events) < MAX_TRACE_EVENTS:
+            if start is None:
+                start = time.perf_counter() - seconds
+            self.events.append((name, start - self.start, seconds, detail))
+
+    def server_timing(self, total: float) -> str:
+        entries = []
+        for name, (seconds, count) in self.phases.items():
+            entry = f"{name};dur={seconds * 1000:.3f}"
+            if count > 1:
+                entry += f';desc="{count}x"'
+            entries.append(entry)
+        entries.append(f"total;dur={total * 1000:.3f}")
+        return ", ".join(entries)
+
+    def trace(self) -> list[dict]:
+        return [
+            {"phase": name, "at_ms": offset * 1000, "ms": seconds * 1000, "detail": detail}
+            for name, offset, seconds, detail in self.events
+        ]
+
+
+_timer: ContextVar[RequestTimer | None] = ContextVar("request_timer", default=None)
+
+
+@contextlib.contextmanager
+def phase(name: str, detail: str = "") -> Iterator[None]:
+    timer = _timer.get()
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.record(name, time.perf_counter() - start, detail, start)
+
+
+def record(name: str, seconds: float, detail: str = "") -> None:
+    timer = _timer.get()
+    if timer is not None:
+        timer.record(name, seconds, detail)
+
+
+class TimingMiddleware:
+    """ASGI middleware adding a Server-Timing header and logging traces of slow requests."""
+
+    def __init__(self, app, slow_ms: float = SLOW_REQUEST_MS):
+        self.app = app
+        self.slow_ms = slow_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timer = RequestTimer()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                total = time.perf_counter() - timer.start
+                header = timer.server_timing(total).encode("latin-1")
+                message["headers"] = [*message.get("headers", []), (b"server-timing", header)]
+            await send(message)
+
+        token = _timer.set(timer)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _timer.reset(token)
+            total_ms = (time.perf_counter() - timer.start) * 1000
+            if total_ms > self.slow_ms:
+                slow_log.warning(
+                    "%s",
+                    json.dumps(
+                        {
+                            "method": scope["method"],
+                            "path": scope["path"],
+                            "query": scope.get("query_string", b"").decode("latin-1"),
+                            "status": status,
+                            "total_ms": total_ms,
+                            "trace": timer.trace(),
+                        }
+                    ),
+                )
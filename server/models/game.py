@@ -6,11 +6,16 @@ import uuid
 
 import sqlalchemy as sa
 import sqlalchemy.orm as orm
+from config import HostRule
+from middleware.timing import phase
 from models.base import BaseModel, uuid_v7
-from sqlalchemy import select
-from sqlalchemy.dialects.postgresql import UUID
+from models.game_history import GameHistory
+from models.history_writer import history_writer
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import UUID, aggregate_order_by, array_agg
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
+from src.executor import HistoryRecord
 
 log = logging.getLogger(__name__)
 
@@ -44,11 +49,18 @@ class Game(BaseModel):
         UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False, index=True
     )
     user = orm.relationship("User")
-    answer = sa.Column(sa.String, nullable=False)
+    # packed candidate set, see src/candidate_codec.py
+    answer = sa.Column(sa.LargeBinary, nullable=False)
     max_rounds = sa.Column(sa.Integer, nullable=False)
     num_attempts = sa.Column(sa.Integer, nullable=False, default=0)
     word_length = sa.Column(sa.Integer, nullable=False)
     is_end = sa.Column(sa.Boolean, nullable=False, index=True, default=False)
+    host_rule = sa.Column(
+        sa.String,
+        nullable=False,
+        default=HostRule.CHEATING.value,
+        server_default=HostRule.CHEATING.value,
+    )
 
     def __str__(self):
         return (
@@ -57,10 +69,11 @@ class Game(BaseModel):
             f"created_at={self.created_at}\n"
             f"updated_at={self.updated_at}\n"
             f"user_id={self.user_id}\n"
-            f"answer={self.answer}\n"
+            f"answer={len(self.answer or b'')} bytes\n"
             f"max_rounds={self.max_rounds}\n"
             f"num_attempts={self.num_attempts}\n"
             f"word_length={self.word_length}\n"
+            f"host_rule={self.host_rule}\n"
             f">"
         )
 
@@ -75,6 +88,76 @@ class Game(BaseModel):
             return None
         return transaction
 
+    @classmethod
+    async def get_with_history(cls, db: AsyncSession, id: str) -> tuple[Game | None, list, bytes]:
+        """The game, its (word, hint) history in order and its current packed candidate set.
+
+        One round trip returning one row: the game columns are read once, the history comes back
+        as word and hint arrays aggregated in attempt order, and only the newest row's candidate
+        set is read, each through the (game_id, attempt) index. Rows still queued in the history
+        writer are merged in by attempt.
+        """
+
+        def history_of(column):
+            return (
+                select(array_agg(aggregate_order_by(column, GameHistory.attempt)))
+                .where(GameHistory.game_id == cls.id)
+                .correlate(cls)
+                .scalar_subquery()
+            )
+
+        last_answer = (
+            select(GameHistory.answer)
+            .where(GameHistory.game_id == cls.id)
+            .order_by(GameHistory.attempt.desc())
+            .limit(1)
+            .correlate(cls)
+            .scalar_subquery()
+        )
+        # taken before the query: a batch committed meanwhile is then in the snapshot, the query
+        # or both, never in neither
+        pending = history_writer.pending(id)
+        try:
+            with phase("game_load"):
+                row = (
+                    await db.execute(
+                        select(
+                            cls,
+                            history_of(GameHistory.word).label("words"),
+                            history_of(GameHistory.hint).label("hints"),
+                            history_of(GameHistory.attempt).label("attempts"),
+                            last_answer.label("last_answer"),
+                        ).where(cls.id == id)
+                    )
+                ).one_or_none()
+        except Exception as e:
+            log.error(e)
+            return None, [], b""
+        if row is None:
+            return None, [], b""
+
+        game = row.Game
+        history = [HistoryRecord(w, h) for w, h in zip(row.words or [], row.hints or [])]
+        packed = row.last_answer or game.answer
+        stored = set(row.attempts or ())
+        pending = [h for h in pending if h.attempt not in stored]
+        if pending:
+            history += [HistoryRecord(h.word, h.hint) for h in pending]
+            packed = pending[-1].answer
+        return game, history, packed
+
+    @classmethod
+    async def update_progress(cls, db: AsyncSession, id, num_attempts: int, is_end: bool) -> None:
+        """Update the columns a guess changes, without loading the row first."""
+        with phase("game_update"):
+            await db.execute(
+                update(cls)
+                .where(cls.id == id)
+                .values(
+                    num_attempts=num_attempts, is_end=is_end, updated_at=datetime.datetime.now()
+                )
+            )
+
     @classmethod
     async def get_all(cls, db: AsyncSession):
         return (await db.execute(select(cls))).scalars().all()
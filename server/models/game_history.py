@@ -6,6 +6,7 @@ import uuid
 
 import sqlalchemy as sa
 import sqlalchemy.orm as orm
+from config import Hint
 from models.base import BaseModel, uuid_v7
 from sqlalchemy import select
 from sqlalchemy.dialects.postgresql import UUID
@@ -39,17 +40,22 @@ class GameHistory(BaseModel):
         nullable=False,
         server_default=sa.func.now(),
     )
-    game_id: str = sa.Column(
-        UUID(as_uuid=True), sa.ForeignKey("games.id"), nullable=False, index=True
-    )
+    game_id: str = sa.Column(UUID(as_uuid=True), sa.ForeignKey("games.id"), nullable=False)
     game = orm.relationship("Game")
+    # 1-based position of the guess in its game
+    attempt = sa.Column(sa.Integer, nullable=False)
     word = sa.Column(sa.String, nullable=False)
-    answer = sa.Column(sa.String, nullable=False)
+    # packed candidate set, see src/candidate_codec.py
+    answer = sa.Column(sa.LargeBinary, nullable=False)
     hint = sa.Column(sa.String, nullable=False)
     hit_count = sa.Column(sa.Integer, nullable=False)
     present_count = sa.Column(sa.Integer, nullable=False)
     miss_count = sa.Column(sa.Integer, nullable=False)
 
+    __table_args__ = (
+        sa.Index("ix_game_history_game_id_attempt", "game_id", "attempt", unique=True),
+    )
+
     def __str__(self):
         return (
             f"<Score\n"
@@ -57,8 +63,9 @@ class GameHistory(BaseModel):
             f"created_at={self.created_at}\n"
             f"updated_at={self.updated_at}\n"
             f"game_id={self.game_id}\n"
+            f"attempt={self.attempt}\n"
             f"word={self.word}\n"
-            f"answer={self.answer}\n"
+            f"answer={len(self.answer or b'')} bytes\n"
             f"hint={self.hint}\n"
             f"hit_count={self.hit_count}\n"
             f"present_count={self.present_count}\n"
@@ -66,6 +73,23 @@ class GameHistory(BaseModel):
             f">"
         )
 
+    @classmethod
+    def from_hint(cls, game_id, attempt: int, word: str, hint: str, answer: bytes) -> GameHistory:
+        now = datetime.datetime.now()
+        return cls(
+            id=uuid_v7(),
+            created_at=now,
+            updated_at=now,
+            game_id=game_id,
+            attempt=attempt,
+            word=word,
+            answer=answer,
+            hint=hint,
+            hit_count=hint.count(Hint.HIT.value),
+            present_count=hint.count(Hint.PRESENT.value),
+            miss_count=hint.count(Hint.MISS.value),
+        )
+
     async def insert(self, db: AsyncSession):
         db.add(self)
         await db.commit()
@@ -75,7 +99,11 @@ class GameHistory(BaseModel):
     @classmethod
     async def get_by_game_id(cls, db: AsyncSession, game_id: str):
         try:
-            return (await db.execute(select(cls).where(cls.game_id == game_id))).scalars().all()
+            return (
+                (await db.execute(select(cls).where(cls.game_id == game_id).order_by(cls.attempt)))
+                .scalars()
+                .all()
+            )
 
         except Exception as e:
             log.error(e)
@@ -87,7 +115,10 @@ class GameHistory(BaseModel):
             return (
                 (
                     await db.execute(
-                        select(cls).where(cls.game_id == game_id).order_by(cls.updated_at.desc())
+                        select(cls)
+                        .where(cls.game_id == game_id)
+                        .order_by(cls.attempt.desc())
+                        .limit(1)
                     )
                 )
                 .scalars()
@@ -0,0 +1,139 @@
+import logging
+import sys
+from dataclasses import dataclass, field, replace
+from typing import Protocol
+
+from config import GAME_CACHE_BACKEND, GAME_CACHE_ENTRIES, GAME_CACHE_TTL
+from models.game import Game
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.executor import HistoryRecord
+from src.hint_cache import BoundedCache
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class GameState:
+    """Snapshot of an in-progress game: the game row, its history and current candidate set."""
+
+    id: object
+    user_id: object
+    max_rounds: int
+    num_attempts: int
+    word_length: int
+    is_end: bool
+    host_rule: str
+    # packed candidate set after the last guess, see src/candidate_codec.py
+    answer: bytes
+    history: list[HistoryRecord] = field(default_factory=list)
+
+    @classmethod
+    def from_game(cls, game: Game, history, answer: bytes) -> "GameState":
+        return cls(
+            id=game.id,
+            user_id=game.user_id,
+            max_rounds=game.max_rounds,
+            num_attempts=game.num_attempts,
+            word_length=game.word_length,
+            is_end=game.is_end,
+            host_rule=game.host_rule,
+            answer=answer,
+            history=[HistoryRecord(h.word, h.hint) for h in history],
+        )
+
+    def nbytes(self) -> int:
+        return sys.getsizeof(self) + len(self.answer) + 64 * len(self.history)
+
+
+class GameStateBackend(Protocol):
+    """Storage of game states by game id, e.g. in-process or a shared cache service."""
+
+    def get(self, key: str) -> GameState | None: ...
+
+    def put(self, key: str, state: GameState) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+    def clear(self) -> None: ...
+
+    def stats(self) -> dict: ...
+
+
+class LocalGameStateBackend:
+    """In-process backend: bounded LRU with a time-to-live. Each worker process has its own."""
+
+    def __init__(self, entries: int = GAME_CACHE_ENTRIES, ttl: float = GAME_CACHE_TTL):
+        self._cache = BoundedCache(entries, sizeof=GameState.nbytes, ttl=ttl)
+
+    def get(self, key: str) -> GameState | None:
+        state = self._cache.get(key)
+        # copies, so a request that fails half way does not leave a modified state behind
+        return replace(state, history=list(state.history)) if state is not None else None
+
+    def put(self, key: str, state: GameState) -> None:
+        self._cache.put(key, replace(state, history=list(state.history)))
+
+    def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+class NoGameStateBackend:
+    def get(self, key: str) -> GameState | None:
+        return None
+
+    def put(self, key: str, state: GameState) -> None:
+        pass
+
+    def delete(self, key: str) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {}
+
+
+class GameStateCache:
+    """Write-through cache of in-progress games in front of the database."""
+
+    def __init__(self, backend: GameStateBackend):
+        self.backend = backend
+
+    async def get(self, db: AsyncSession, id: str) -> GameState | None:
+        state = self.backend.get(str(id))
+        if state is not None:
+            return state
+        game, history, answer = await Game.get_with_history(db, id)
+        if game is None:
+            return None
+        state = GameState.from_game(game, history, answer)
+        self.put(state)
+        return state
+
+    def put(self, state: GameState) -> None:
+        """Store `state` after it was committed. Finished games are dropped instead."""
+        if state.is_end:
+            self.invalidate(state.id)
+        else:
+            self.backend.put(str(state.id), state)
+
+    def invalidate(self, id) -> None:
+        self.backend.delete(str(id))
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        return {"backend": type(self.backend).__name__, **self.backend.stats()}
+
+
+BACKENDS = {"local": LocalGameStateBackend, "none": NoGameStateBackend}
+
+game_cache = GameStateCache(BACKENDS[GAME_CACHE_BACKEND]())
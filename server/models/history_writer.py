@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import time
+from typing import Any
+
+from config import (
+    HISTORY_FLUSH_MS,
+    HISTORY_FLUSH_RETRIES,
+    HISTORY_FLUSH_ROWS,
+    HISTORY_WRITE_MODE,
+)
+from middleware.timing import phase
+from models.game_history import GameHistory
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+
+log = logging.getLogger(__name__)
+
+WRITE_MODES = ("sync", "group", "async")
+
+
+class HistoryWriter:
+    """Write-behind queue for `GameHistory` rows, flushed as one multi-row INSERT.
+
+    Rows are flushed every `flush_ms` milliseconds, or as soon as `max_rows` are queued.
+    `mode` sets the durability of a submit:
+    - "sync": no queue, the row is committed with the request (default).
+    - "group": the request waits until the batch holding its row is committed (group commit).
+    - "async": the request returns once the row is queued; queued rows are lost on a crash.
+    Queued rows stay visible through `pending` until their batch is committed.
+    When a batch fails, its rows are written one by one. A row the database rejects, e.g. a
+    duplicate (game_id, attempt), is logged and dropped. When the database itself fails, "async"
+    rows are queued again, and dropped after `max_retries` failed flushes.
+    """
+
+    def __init__(
+        self,
+        mode: str = HISTORY_WRITE_MODE,
+        flush_ms: int = HISTORY_FLUSH_MS,
+        max_rows: int = HISTORY_FLUSH_ROWS,
+        max_retries: int = HISTORY_FLUSH_RETRIES,
+    ):
+        if mode not in WRITE_MODES:
+            raise ValueError(f"Unknown history write mode: {mode}")
+        self.mode = mode
+        self.flush_ms = flush_ms
+        self.max_rows = max_rows
+        self.max_retries = max_retries
+        self._manager = None
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+        self._wakeup: asyncio.Event | None = None
+        self._lock: asyncio.Lock | None = None
+        self._queue: list[tuple[GameHistory, asyncio.Future | None]] = []
+        # by str(game_id), request paths look games up by the id string
+        self._pending: dict[str, list[GameHistory]] = {}
+        # failed flushes per queued row, by id()
+        self._attempts: dict[int, int] = {}
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.failed_flushes = 0
+        self.dropped_rows = 0
+        self.flush_seconds = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self._task is not None
+
+    def start(self, manager) -> None:
+        """Start the flush loop on the running event loop, writing through `manager` sessions."""
+        if self.mode == "sync":
+            return
+        self._manager = manager
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write everything still queued."""
+        if self._task is None:
+            return
+        # not cancelled, a flush in progress holds rows that are no longer in the queue
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+        await self.flush()
+        if self._queue:
+            log.error(f"{len(self._queue)} history rows could not be written on shutdown")
+
+    async def add(self, row: GameHistory) -> None:
+        future = asyncio.get_running_loop().create_future() if self.mode == "group" else None
+        self._queue.append((row, future))
+        self._pending.setdefault(str(row.game_id), []).append(row)
+        if len(self._queue) >= self.max_rows:
+            self._wakeup.set()
+        if future is not None:
+            with phase("history_flush_wait"):
+                await future
+
+    def pending(self, game_id) -> list[GameHistory]:
+        """Rows of `game_id` queued or being flushed, oldest first."""
+        return list(self._pending.get(str(game_id), ()))
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_ms / 1000)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        async with self._lock:
+            batch, self._queue = self._queue, []
+            if not batch:
+                return
+            start = time.perf_counter()
+            try:
+                await self._insert([row for row, _ in batch])
+            except Exception as e:
+                self.failed_flushes += 1
+                log.error(f"Failed to write {len(batch)} history rows, retry one by one: {e}")
+                await self._insert_each(batch)
+                return
+            self.flushes += 1
+            self.flushed_rows += len(batch)
+            self.flush_seconds += time.perf_counter() - start
+            self._release(batch)
+
+    async def _insert(self, rows: list[GameHistory]) -> None:
+        async with self._manager.session() as db:
+            await db.execute(insert(GameHistory), [_values(row) for row in rows])
+            await db.commit()
+
+    async def _insert_each(self, batch) -> None:
+        for i, (row, future) in enumerate(batch):
+            try:
+                await self._insert([row])
+            except (IntegrityError, DataError) as e:
+                self.dropped_rows += 1
+                log.error(f"Dropped history row {row.game_id} attempt {row.attempt}: {e}")
+                self._release([(row, future)], e)
+            except Exception as e:
+                # not the row but the database, the rest is not tried now
+                self._retry(batch[i:], e)
+                return
+            else:
+                self.flushed_rows += 1
+                self._release([(row, future)])
+
+    def _retry(self, batch, error: Exception) -> None:
+        if self.mode != "async":
+            self._release(batch, error)
+            return
+        retry = []
+        for row, future in batch:
+            attempts = self._attempts.get(id(row), 0) + 1
+            if attempts >= self.max_retries:
+                self.dropped_rows += 1
+                log.error(f"Dropped history row {row.game_id} attempt {row.attempt}: {error}")
+                self._release([(row, future)], error)
+            else:
+                self._attempts[id(row)] = attempts
+                retry.append((row, future))
+        # nobody waits for async rows, they are retried on the next flush
+        self._queue[:0] = retry
+
+    def _release(self, batch, error: Exception | None = None) -> None:
+        for row, future in batch:
+            self._attempts.pop(id(row), None)
+            rows = self._pending.get(str(row.game_id), [])
+            if row in rows:
+                rows.remove(row)
+            if not rows:
+                self._pending.pop(str(row.game_id), None)
+            if future is not None and not future.done():
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+
+    def stats(self) -> dict[str, int | float | str]:
+        return {
+            "mode": self.mode,
+            "queued": len(self._queue),
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "failed_flushes": self.failed_flushes,
+            "dropped_rows": self.dropped_rows,
+            "flush_seconds": self.flush_seconds,
+        }
+
+
+def _values(row: GameHistory) -> dict[str, Any]:
+    return {c.key: getattr(row, c.key) for c in GameHistory.__table__.columns}
+
+
+history_writer = HistoryWriter()
@@ -1,15 +1,85 @@
+# Alembic is imported inside the functions: it is only needed when the schema is checked or
+# upgraded, and is one of the heaviest imports of a worker.
+from __future__ import annotations
+
+import asyncio
+import logging
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from alembic import command
-from alembic.config import Config
+import sqlalchemy as sa
+from config import DB_MIGRATE
 
+if TYPE_CHECKING:
+    from alembic.config import Config
+
+log = logging.getLogger(__name__)
+
+MIGRATE_MODES = ("upgrade", "check", "skip")
+# pg_advisory_lock key, so that workers booting together upgrade one at a time
+MIGRATION_LOCK = 0x776F72646C65
+
+
+def alembic_config(dsn: str | None = None) -> Config:
+    from alembic.config import Config
 
-def run_migrations(dsn: str) -> None:
-    # parse url redact password
-    redacted = dsn.replace(dsn.split("@")[0].split("://")[1], "********")
     script_location = Path(__file__).resolve().parent.parent / "alembic"
-    print(f"Running DB migrations in {script_location} on {redacted}")
     alembic_cfg = Config()
     alembic_cfg.set_main_option("script_location", script_location.as_posix())
-    alembic_cfg.set_main_option("sqlalchemy.url", dsn)
-    command.upgrade(alembic_cfg, "head")
+    if dsn is not None:
+        alembic_cfg.set_main_option("sqlalchemy.url", dsn)
+    return alembic_cfg
+
+
+def head_revision() -> str:
+    """Revision of the newest migration script, read from the files only."""
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def current_revision(conn: sa.Connection) -> str | None:
+    """Revision the database is at, None before the first migration."""
+    from alembic.runtime.migration import MigrationContext
+
+    return MigrationContext.configure(conn).get_current_revision()
+
+
+def run_migrations(dsn: str) -> None:
+    from alembic import command
+
+    # parse url redact password
+    redacted = dsn.replace(dsn.split("@")[0].split("://")[1], "********")
+    log.info(f"Running DB migrations on {redacted}")
+    engine = sa.create_engine(dsn, poolclass=sa.NullPool)
+    try:
+        with engine.connect() as lock:
+            lock.execute(sa.select(sa.func.pg_advisory_lock(MIGRATION_LOCK)))
+            try:
+                command.upgrade(alembic_config(dsn), "head")
+            finally:
+                lock.execute(sa.select(sa.func.pg_advisory_unlock(MIGRATION_LOCK)))
+    finally:
+        engine.dispose()
+
+
+async def migrate(manager, dsn: str, mode: str = DB_MIGRATE) -> None:
+    """Bring the schema to head at startup.
+
+    - "upgrade": always run `alembic upgrade head` through the sync driver.
+    - "check": read the revision on a pooled async connection and upgrade only when it is behind.
+    - "skip": leave the schema alone, e.g. when a deploy step runs the migrations.
+    """
+    if mode not in MIGRATE_MODES:
+        raise ValueError(f"Unknown migrate mode: {mode}")
+    if mode == "skip":
+        return
+    if mode == "check":
+        async with manager.connect() as conn:
+            current = await conn.run_sync(current_revision)
+        head = head_revision()
+        if current == head:
+            log.info(f"Schema is at head {head}, skip migrations")
+            return
+        log.info(f"Schema is at {current}, upgrade to {head}")
+    await asyncio.to_thread(run_migrations, dsn)
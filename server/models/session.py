@@ -1,7 +1,19 @@
 import contextlib
+import threading
+import time
 from collections.abc import AsyncIterator
 from typing import Any
 
+from config import (
+    DB_APPLICATION_NAME,
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_STATEMENT_CACHE_SIZE,
+)
+from sqlalchemy import exc
 from sqlalchemy.ext.asyncio import (
     AsyncConnection,
     AsyncSession,
@@ -9,15 +21,79 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 
 class Base(DeclarativeBase):
     __mapper_args__ = {"eager_defaults": True}
 
 
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.checkouts, pool.timeouts = self.checkouts, self.timeouts
+        pool.wait_seconds, pool.max_wait_seconds = self.wait_seconds, self.max_wait_seconds
+        return pool
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_seconds": self.wait_seconds,
+            "max_wait_seconds": self.max_wait_seconds,
+        }
+
+
+def engine_options() -> dict[str, Any]:
+    """Engine keyword arguments from the DB_* settings in config."""
+    return {
+        "poolclass": TimedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "connect_args": {
+            # asyncpg prepared statements cached per connection
+            "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+            "server_settings": {"application_name": DB_APPLICATION_NAME},
+        },
+    }
+
+
 class DatabaseSessionManager:
     def __init__(self, host: str, engine_kwargs: dict[str, Any] = {}):
-        self._engine = create_async_engine(host, **engine_kwargs)
+        self._engine = create_async_engine(host, **{**engine_options(), **engine_kwargs})
         self._sessionmaker = async_sessionmaker(
             autocommit=False, bind=self._engine, expire_on_commit=False
         )
@@ -30,6 +106,14 @@ class DatabaseSessionManager:
         self._engine = None
         self._sessionmaker = None
 
+    def pool_stats(self) -> dict[str, int | float]:
+        if self._engine is None:
+            raise Exception("DatabaseSessionManager is not initialized")
+        pool = self._engine.pool
+        if isinstance(pool, TimedQueuePool):
+            return pool.stats()
+        return {"status": pool.status()}
+
     @contextlib.asynccontextmanager
     async def connect(self) -> AsyncIterator[AsyncConnection]:
         if self._engine is None:
@@ -0,0 +1,109 @@
+import asyncio
+from types import SimpleNamespace
+
+import models.game
+import models.user  # noqa: F401
+import pytest
+from models.game import Game
+from models.game_history import GameHistory
+from models.history_writer import HistoryWriter, history_writer
+from sqlalchemy.dialects import postgresql
+from src.executor import HistoryRecord
+
+
+class FakeResult:
+    def __init__(self, row):
+        self.row = row
+
+    def one_or_none(self):
+        return self.row
+
+
+class FakeSession:
+    def __init__(self, row=None, during=None):
+        self.row = row
+        self.during = during
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        if self.during is not None:
+            self.during()
+        return FakeResult(self.row)
+
+
+def stored(game, history, last_answer=None):
+    """A get_with_history result row for `history` pairs of (word, hint) in the database."""
+    words = [w for w, _ in history] or None
+    hints = [h for _, h in history] or None
+    attempts = list(range(1, len(history) + 1)) or None
+    return SimpleNamespace(
+        Game=game, words=words, hints=hints, attempts=attempts, last_answer=last_answer
+    )
+
+
+def compile_sql(statement) -> str:
+    return " ".join(str(statement.compile(dialect=postgresql.dialect())).split())
+
+
+def test_get_with_history_reads_the_game_once():
+    game = SimpleNamespace(id="g1", answer=b"\x01")
+    db = FakeSession(stored(game, [("hello", "_+___"), ("world", "_____")], b"\x03"))
+    loaded, history, packed = asyncio.run(Game.get_with_history(db, "g1"))
+    assert loaded is game
+    assert history == [HistoryRecord("hello", "_+___"), HistoryRecord("world", "_____")]
+    assert packed == b"\x03"
+
+    [statement] = db.statements
+    sql = compile_sql(statement)
+    assert "JOIN" not in sql
+    assert "array_agg(game_history.word ORDER BY game_history.attempt)" in sql
+    assert "array_agg(game_history.hint ORDER BY game_history.attempt)" in sql
+    assert "array_agg(game_history.attempt ORDER BY game_history.attempt)" in sql
+    assert "ORDER BY game_history.attempt DESC LIMIT" in sql
+    assert sql.endswith("FROM games WHERE games.id = %(id_1)s::UUID")
+
+
+def test_get_with_history_without_history(monkeypatch):
+    monkeypatch.setattr(history_writer, "pending", lambda game_id: [])
+    game = SimpleNamespace(id="g1", answer=b"\x01")
+    db = FakeSession(stored(game, []))
+    assert asyncio.run(Game.get_with_history(db, "g1")) == (game, [], b"\x01")
+    assert asyncio.run(Game.get_with_history(FakeSession(), "g2")) == (None, [], b"")
+
+
+@pytest.mark.parametrize(
+    "committed_before_query, released_during_query", [(True, True), (False, True), (True, False)]
+)
+def test_get_with_history_flush_during_load(
+    monkeypatch, committed_before_query, released_during_query
+):
+    # the batch holding attempt 2 is committed and released around the load: the row must come
+    # from the query or the pending snapshot taken before it, exactly once
+    writer = HistoryWriter(mode="async")
+    monkeypatch.setattr(models.game, "history_writer", writer)
+    row = GameHistory.from_hint("g1", 2, "world", "_____", b"\x03")
+    asyncio.run(writer.add(row))
+
+    game = SimpleNamespace(id="g1", answer=b"\x01")
+    history = [("hello", "_+___")]
+    if committed_before_query:
+        history.append(("world", "_____"))
+    db = FakeSession(
+        stored(game, history, b"\x03" if committed_before_query else b"\x02"),
+        during=(lambda: writer._release([(row, None)])) if released_during_query else None,
+    )
+    loaded, history, packed = asyncio.run(Game.get_with_history(db, "g1"))
+    assert history == [HistoryRecord("hello", "_+___"), HistoryRecord("world", "_____")]
+    assert packed == b"\x03"
+
+
+def test_update_progress_sql():
+    db = FakeSession()
+    asyncio.run(Game.update_progress(db, "g1", 3, False))
+    [statement] = db.statements
+    sql = compile_sql(statement)
+    assert sql.startswith(
+        "UPDATE games SET updated_at=%(updated_at)s, num_attempts=%(num_attempts)s,"
+        " is_end=%(is_end)s WHERE games.id ="
+    )
@@ -0,0 +1,65 @@
+import asyncio
+from types import SimpleNamespace
+
+import models.user  # noqa: F401
+from models.game import Game
+from models.game_state import GameState, GameStateCache, LocalGameStateBackend
+from src.executor import HistoryRecord
+
+
+def make_game(**kwargs):
+    values = dict(
+        id="g1",
+        user_id="u1",
+        max_rounds=6,
+        num_attempts=1,
+        word_length=5,
+        is_end=False,
+        host_rule="cheating",
+        answer=b"\x01",
+    )
+    return SimpleNamespace(**{**values, **kwargs})
+
+
+def test_miss_loads_from_database_then_hits(monkeypatch):
+    calls = []
+
+    async def get_with_history(db, id):
+        calls.append(id)
+        return make_game(), [HistoryRecord("hello", "_____")], b"\x02"
+
+    monkeypatch.setattr(Game, "get_with_history", get_with_history)
+    cache = GameStateCache(LocalGameStateBackend(10, ttl=60))
+
+    async def main():
+        first = await cache.get(None, "g1")
+        second = await cache.get(None, "g1")
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert calls == ["g1"]
+    assert second == first and second.answer == b"\x02"
+    assert second.history == [HistoryRecord("hello", "_____")]
+
+
+def test_backend_returns_copies():
+    cache = GameStateCache(LocalGameStateBackend(10, ttl=60))
+    cache.put(GameState.from_game(make_game(), [], b"\x01"))
+    state = cache.backend.get("g1")
+    state.history.append(HistoryRecord("hello", "_____"))
+    state.num_attempts += 1
+    assert cache.backend.get("g1").history == []
+    assert cache.backend.get("g1").num_attempts == 1
+
+
+def test_finished_games_are_dropped():
+    cache = GameStateCache(LocalGameStateBackend(10, ttl=60))
+    state = GameState.from_game(make_game(), [], b"\x01")
+    cache.put(state)
+    state.is_end = True
+    cache.put(state)
+    assert cache.backend.get("g1") is None
+
+    cache.put(GameState.from_game(make_game(), [], b"\x01"))
+    cache.invalidate("g1")
+    assert cache.backend.get("g1") is None
@@ -0,0 +1,170 @@
+import asyncio
+import contextlib
+
+import models.game  # noqa: F401
+import models.user  # noqa: F401
+import pytest
+from models.game_history import GameHistory
+from models.history_writer import HistoryWriter
+from sqlalchemy.exc import IntegrityError
+
+
+class FakeSession:
+    def __init__(self, manager):
+        self.manager = manager
+
+    async def execute(self, statement, rows):
+        if self.manager.fail:
+            raise RuntimeError("database is down")
+        if any(row["word"] == "dupe" for row in rows):
+            raise IntegrityError("INSERT", {}, Exception("duplicate key"))
+        self.manager.batches.append([row["word"] for row in rows])
+
+    async def commit(self):
+        pass
+
+
+class FakeManager:
+    def __init__(self):
+        self.batches = []
+        self.fail = False
+
+    @contextlib.asynccontextmanager
+    async def session(self):
+        yield FakeSession(self)
+
+
+def row(game_id, word):
+    return GameHistory.from_hint(game_id, 1, word, "_____", b"\x01")
+
+
+def test_sync_mode_does_not_queue():
+    async def main():
+        writer = HistoryWriter("sync")
+        writer.start(FakeManager())
+        assert not writer.enabled
+
+    asyncio.run(main())
+
+
+def test_async_rows_are_pending_until_flushed():
+    async def main():
+        manager = FakeManager()
+        writer = HistoryWriter("async", flush_ms=10_000, max_rows=100)
+        writer.start(manager)
+        await writer.add(row("g1", "hello"))
+        await writer.add(row("g2", "world"))
+        await writer.add(row("g1", "fancy"))
+        assert [r.word for r in writer.pending("g1")] == ["hello", "fancy"]
+        assert manager.batches == []
+
+        await writer.stop()
+        assert manager.batches == [["hello", "world", "fancy"]]
+        assert writer.pending("g1") == []
+        assert writer.stats()["flushed_rows"] == 3
+
+    asyncio.run(main())
+
+
+def test_group_mode_waits_for_commit_and_flushes_on_max_rows():
+    async def main():
+        manager = FakeManager()
+        writer = HistoryWriter("group", flush_ms=10_000, max_rows=2)
+        writer.start(manager)
+        await asyncio.gather(writer.add(row("g1", "hello")), writer.add(row("g2", "world")))
+        assert manager.batches == [["hello", "world"]]
+        await writer.stop()
+
+    asyncio.run(main())
+
+
+def test_failed_flush():
+    async def main():
+        manager = FakeManager()
+        manager.fail = True
+        group = HistoryWriter("group", flush_ms=5)
+        group.start(manager)
+        with pytest.raises(RuntimeError):
+            await group.add(row("g1", "hello"))
+        assert group.pending("g1") == []
+        await group.stop()
+
+        # async rows stay queued and are retried
+        writer = HistoryWriter("async", flush_ms=5)
+        writer.start(manager)
+        await writer.add(row("g1", "hello"))
+        await asyncio.sleep(0.05)
+        assert writer.stats()["failed_flushes"] >= 1
+        assert [r.word for r in writer.pending("g1")] == ["hello"]
+        manager.fail = False
+        await writer.stop()
+        assert manager.batches == [["hello"]]
+
+    asyncio.run(main())
+
+
+def test_stop_during_flush(monkeypatch):
+    execute = FakeSession.execute
+
+    async def slow_execute(self, statement, rows):
+        await asyncio.sleep(0.05)
+        await execute(self, statement, rows)
+
+    monkeypatch.setattr(FakeSession, "execute", slow_execute)
+
+    async def main():
+        manager = FakeManager()
+        writer = HistoryWriter("group", flush_ms=10_000, max_rows=1)
+        writer.start(manager)
+        add = asyncio.create_task(writer.add(row("g1", "hello")))
+        # the flush loop has taken the row off the queue and is writing it
+        await asyncio.sleep(0.01)
+        await writer.stop()
+        await add
+        assert manager.batches == [["hello"]]
+        assert writer.pending("g1") == []
+
+    asyncio.run(main())
+
+
+def test_rejected_row_is_dropped():
+    async def main():
+        manager = FakeManager()
+        writer = HistoryWriter("async", flush_ms=10_000)
+        writer.start(manager)
+        for word in ["hello", "dupe", "world"]:
+            await writer.add(row("g1", word))
+        await writer.flush()
+        # the batch failed, then every other row was written on its own
+        assert manager.batches == [["hello"], ["world"]]
+        assert writer.pending("g1") == []
+        assert writer.stats()["dropped_rows"] == 1
+
+        group = HistoryWriter("group", flush_ms=5)
+        group.start(manager)
+        with pytest.raises(IntegrityError):
+            await asyncio.gather(group.add(row("g2", "dupe")), group.add(row("g2", "fancy")))
+        await group.stop()
+        await writer.stop()
+        assert manager.batches[-1] == ["fancy"]
+
+    asyncio.run(main())
+
+
+def test_async_retry_limit():
+    async def main():
+        manager = FakeManager()
+        manager.fail = True
+        writer = HistoryWriter("async", flush_ms=10_000, max_retries=3)
+        writer.start(manager)
+        await writer.add(row("g1", "hello"))
+        for _ in range(3):
+            await writer.flush()
+        assert writer.stats()["queued"] == 0
+        assert writer.stats()["dropped_rows"] == 1
+        assert writer.pending("g1") == []
+        manager.fail = False
+        await writer.stop()
+        assert manager.batches == []
+
+    asyncio.run(main())
@@ -0,0 +1,17 @@
+import sqlalchemy as sa
+from alembic.script import ScriptDirectory
+from models.migration import alembic_config, current_revision, head_revision
+
+
+def test_single_head():
+    # workers compare against one head, a branched history must be merged first
+    assert ScriptDirectory.from_config(alembic_config()).get_heads() == [head_revision()]
+
+
+def test_current_revision():
+    engine = sa.create_engine("sqlite://")
+    with engine.connect() as conn:
+        assert current_revision(conn) is None
+        conn.execute(sa.text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)"))
+        conn.execute(sa.text(f"INSERT INTO alembic_version VALUES ('{head_revision()}')"))
+        assert current_revision(conn) == head_revision()
@@ -0,0 +1,73 @@
+import asyncio
+import sqlite3
+
+import pytest
+from models.session import TimedQueuePool, engine_options
+from sqlalchemy import exc
+from sqlalchemy.util import greenlet_spawn
+
+
+def in_greenlet(fn):
+    # the async-adapted queue waits through await_only, as it does under an AsyncEngine
+    return asyncio.run(greenlet_spawn(fn))
+
+
+def pool(size: int = 1, timeout: float = 0.05) -> TimedQueuePool:
+    return TimedQueuePool(
+        lambda: sqlite3.connect(":memory:", check_same_thread=False),
+        pool_size=size,
+        max_overflow=0,
+        timeout=timeout,
+    )
+
+
+def test_checkouts_are_counted():
+    def body():
+        p = pool(size=2)
+        first, second = p.connect(), p.connect()
+        stats = p.stats()
+        first.close()
+        second.close()
+        return stats, p.stats()
+
+    busy, idle = in_greenlet(body)
+    assert busy["checkouts"] == 2
+    assert busy["checked_out"] == 2
+    assert busy["timeouts"] == 0
+    assert idle["checked_out"] == 0
+    assert idle["idle"] == 2
+
+
+def test_timeout_and_wait_time():
+    def body():
+        p = pool(size=1, timeout=0.05)
+        held = p.connect()
+        with pytest.raises(exc.TimeoutError):
+            p.connect()
+        held.close()
+        return p
+
+    p = in_greenlet(body)
+    stats = p.stats()
+    assert stats["checkouts"] == 2
+    assert stats["timeouts"] == 1
+    assert stats["max_wait_seconds"] >= 0.05
+    assert stats["wait_seconds"] >= stats["max_wait_seconds"]
+
+
+def test_recreate_keeps_counters():
+    def body():
+        p = pool()
+        p.connect().close()
+        return p.recreate()
+
+    assert in_greenlet(body).stats()["checkouts"] == 1
+
+
+def test_engine_options():
+    options = engine_options()
+    assert options["poolclass"] is TimedQueuePool
+    # a ping round trip on every checkout is opt-in
+    assert options["pool_pre_ping"] is False
+    # src/vocab_import.py finds running servers by it
+    assert options["connect_args"]["server_settings"]["application_name"] == "wordle-server"
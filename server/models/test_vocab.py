@@ -0,0 +1,26 @@
+import asyncio
+
+from models.vocab import Vocabulary
+from sqlalchemy.dialects import postgresql
+
+
+class FakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return iter(self.rows)
+
+
+def test_get_vocabulary_reads_words_and_weights_together():
+    db = FakeSession([(4, "dune", 1.0), (5, "hello", 2.5), (5, "world", 0.5)])
+    words, weights = asyncio.run(Vocabulary.get_vocabulary(db))
+    assert words == {4: ["dune"], 5: ["hello", "world"]}
+    assert weights == {4: [1.0], 5: [2.5, 0.5]}
+
+    [statement] = db.statements
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "vocabularies.weight" in sql
+    assert sql.endswith("ORDER BY vocabularies.length, vocabularies.ordinal")
@@ -12,9 +12,14 @@ from models.base import BaseModel, uuid_v7
 from sqlalchemy import func, select
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
+from src.sampling import sample_distinct
+from src.vocab_index import get_vocab_index
 
 log = logging.getLogger(__name__)
 
+# advanced on every change to `vocabularies`, so each worker can tell its in-memory copy is stale
+vocabulary_version = sa.Sequence("vocabulary_version", metadata=BaseModel.metadata)
+
 
 class Vocabulary(BaseModel):
     __tablename__ = "vocabularies"
@@ -43,6 +48,12 @@ class Vocabulary(BaseModel):
     )
     word: str = sa.Column(sa.String, index=True, nullable=False, unique=True)
     length: int = sa.Column(sa.Integer, index=True, nullable=False)
+    # dense 0-based position of the word among the words of the same length
+    ordinal: int = sa.Column(sa.Integer, nullable=False)
+    # relative commonness, answers are sampled proportionally to it
+    weight: float = sa.Column(sa.Float, nullable=False, default=1.0, server_default="1")
+
+    __table_args__ = (sa.Index("ix_vocabularies_length_ordinal", "length", "ordinal", unique=True),)
 
     def __str__(self) -> str:
         return (
@@ -59,24 +70,27 @@ class Vocabulary(BaseModel):
         return (await db.execute(select(cls).where(cls.word == word))).scalar_one_or_none()
 
     @classmethod
-    async def get_random_word(cls, db: AsyncSession, length: int) -> Vocabulary | None:
-        total_count = (
-            await db.execute(
-                select(func.count()).select_from(Vocabulary).where(Vocabulary.length == length)
-            )
+    async def count_by_length(cls, db: AsyncSession, length: int) -> int:
+        # ordinals are dense per length, so the count is the last entry of the (length, ordinal)
+        # index instead of a scan of the length bucket
+        last = (
+            await db.execute(select(func.max(cls.ordinal)).where(cls.length == length))
         ).scalar()
+        return 0 if last is None else last + 1
 
+    @classmethod
+    async def get_random_word(cls, db: AsyncSession, length: int) -> Vocabulary | None:
+        total_count = await cls.count_by_length(db, length)
         if not total_count:
             return None
 
         return (
             await db.execute(
-                select(cls)
-                .where(cls.length == length)
-                .offset(random.randint(0, total_count - 1))
-                .limit(1)
+                select(cls).where(
+                    cls.length == length, cls.ordinal == random.randrange(total_count)
+                )
             )
-        ).scalar_one()
+        ).scalar_one_or_none()
 
     @classmethod
     def get_random_word_from_list(cls, words: list[str]) -> str:
@@ -84,15 +98,44 @@ class Vocabulary(BaseModel):
 
     @classmethod
     async def get_random_words(cls, db: AsyncSession, length: int, count: int) -> list[Vocabulary]:
-        return (
-            (
-                await db.execute(
-                    select(cls).where(cls.length == length).order_by(func.random()).limit(count)
-                )
-            )
+        """Up to `count` distinct random words, fetched by random ordinals in O(count)."""
+        ordinals = sample_distinct(await cls.count_by_length(db, length), count)
+        if not ordinals:
+            return []
+        words = (
+            (await db.execute(select(cls).where(cls.length == length, cls.ordinal.in_(ordinals))))
             .scalars()
             .all()
         )
+        order = {o: i for i, o in enumerate(ordinals)}
+        return sorted(words, key=lambda w: order[w.ordinal])
+
+    @classmethod
+    async def get_vocabulary(
+        cls, db: AsyncSession
+    ) -> tuple[dict[int, list[str]], dict[int, list[float]]]:
+        """All words and their weights per length, in ordinal order.
+
+        One query, so the two always describe the same snapshot of the table.
+        """
+        result = await db.execute(
+            select(cls.length, cls.word, cls.weight).order_by(cls.length, cls.ordinal)
+        )
+        words: dict[int, list[str]] = {}
+        weights: dict[int, list[float]] = {}
+        for length, word, weight in result:
+            words.setdefault(length, []).append(word)
+            weights.setdefault(length, []).append(weight)
+        return words, weights
+
+    @classmethod
+    async def get_version(cls, db: AsyncSession) -> int:
+        return (await db.execute(sa.text("SELECT last_value FROM vocabulary_version"))).scalar_one()
+
+    @classmethod
+    async def bump_version(cls, db: AsyncSession) -> int:
+        # nextval is not transactional, other workers see the new version right away
+        return (await db.execute(select(vocabulary_version.next_value()))).scalar_one()
 
     @classmethod
     async def get_all_word_lengths(cls, db: AsyncSession) -> list[int]:
@@ -103,6 +146,18 @@ class Vocabulary(BaseModel):
     async def get_random_word_by_length(
         cls, db: AsyncSession, length: int, maps: Mapping[str, str], count: int
     ) -> list[Vocabulary]:
+        # the in-memory positional index answers the constraints without scanning the bucket
+        index = get_vocab_index()
+        if index.words.get(length):
+            ordinals = index.matching_ordinals(length, maps)
+            picked = [int(ordinals[i]) for i in sample_distinct(len(ordinals), count)]
+            if not picked:
+                return []
+            result = await db.execute(
+                select(cls).where(cls.length == length, cls.ordinal.in_(picked))
+            )
+            return result.scalars().all()
+
         query = select(cls).where(cls.length == length)
 
         for word, hint in maps.items():
@@ -1,22 +1,115 @@
+import asyncio
+import hmac
 import logging
 import os
 import sys
+import time
 from contextlib import asynccontextmanager
 
-import uvicorn
-from config import DB_URL, ENV
-from fastapi import FastAPI
+from config import (
+    ADMIN_TOKEN,
+    DB_URL,
+    ENV,
+    FEEDBACK_MATRIX_DIR,
+    METRICS_FLUSH_SECONDS,
+    VOCABULARY_CHECK_SECONDS,
+    WARM_UP_TIMEOUT,
+)
+from fastapi import Depends, FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from middleware.custom_logging import logger_config, setup_logging
-from models.migration import run_migrations
-from models.session import init_db_session, sessionmanager
+from fastapi.responses import JSONResponse, PlainTextResponse
+from middleware.custom_logging import logger_config, logging_stats, setup_logging
+from middleware.metrics import MetricsMiddleware, instrument_engine
+from middleware.timing import TimingMiddleware
+from models.game_state import game_cache
+from models.history_writer import history_writer
+from models.migration import migrate
+from models.session import get_db_session, init_db_session
+from models.vocab import Vocabulary
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.executor import host_executor
+from src.feedback_matrix import load_feedback_matrices
+from src.hint_cache import cache_stats, row_cache
+from src.metrics import registry
+from src.startup_profile import startup_phases
+from src.transposition import transposition_table
+from src.vocab_index import VocabularyIndex, get_vocab_index, load_vocabulary
 from views import game
 
 setup_logging()
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
-handler = logging.StreamHandler(stream=sys.stdout)
-logger.addHandler(handler)
+vocabulary_lock = asyncio.Lock()
+
+
+async def warm_up(app: FastAPI, manager) -> None:
+    """Load the in-memory caches, retrying with backoff, then mark the worker ready."""
+    start = time.perf_counter()
+    delay = 1.0
+    while True:
+        try:
+            # word table ids must be the vocabulary ordinals before any candidates are packed
+            with startup_phases.phase("vocabulary"):
+                async with manager.session() as db:
+                    # read before the words, so a change in between triggers another reload
+                    app.state.vocabulary_version = await Vocabulary.get_version(db)
+                    load_vocabulary(*await Vocabulary.get_vocabulary(db))
+            with startup_phases.phase("feedback_matrices"):
+                await asyncio.to_thread(load_feedback_matrices, FEEDBACK_MATRIX_DIR)
+            # started after the vocabulary is loaded, host workers are initialized with it
+            with startup_phases.phase("host_executor"):
+                host_executor.start()
+            break
+        except Exception as e:
+            host_executor.shutdown()
+            app.state.warm_up_error = str(e)
+            logger.error(f"Warm up failed, retry in {delay:.0f}s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+    app.state.warm_up_error = None
+    app.state.ready = True
+    logger.info(f"Ready after {time.perf_counter() - start:.2f}s of warm up")
+
+
+async def reload_worker_vocabulary(app: FastAPI, db: AsyncSession) -> VocabularyIndex:
+    """Reload this worker's vocabulary and everything derived from it."""
+    async with vocabulary_lock:
+        version = await Vocabulary.get_version(db)
+        index = load_vocabulary(*await Vocabulary.get_vocabulary(db))
+        await asyncio.to_thread(load_feedback_matrices, FEEDBACK_MATRIX_DIR)
+        # cached candidate sets are packed by ordinal, which an import may have changed
+        game_cache.clear()
+        # keyed by the replaced word tables, their entries can no longer hit
+        transposition_table.clear()
+        row_cache.clear()
+        # process host workers hold the old word tables
+        host_executor.restart()
+        app.state.vocabulary_version = version
+    logger.info(f"Reloaded vocabulary version {version}: {len(index)} words")
+    return index
+
+
+async def watch_vocabulary(app: FastAPI, manager) -> None:
+    """Reload the vocabulary once another process advanced `vocabulary_version`."""
+    while VOCABULARY_CHECK_SECONDS > 0:
+        await asyncio.sleep(VOCABULARY_CHECK_SECONDS)
+        if not app.state.ready:
+            continue
+        try:
+            async with manager.session() as db:
+                if await Vocabulary.get_version(db) != app.state.vocabulary_version:
+                    await reload_worker_vocabulary(app, db)
+        except Exception as e:
+            logger.error(f"Vocabulary check failed: {e}")
+
+
+async def write_metrics() -> None:
+    """Share this worker's metrics with the others through METRICS_DIR, if set."""
+    while registry.directory is not None:
+        await asyncio.sleep(METRICS_FLUSH_SECONDS)
+        try:
+            await asyncio.to_thread(registry.write_snapshot)
+        except OSError as e:
+            logger.error(f"Failed to write metrics snapshot: {e}")
 
 
 @asynccontextmanager
@@ -24,16 +117,48 @@ async def lifespan(app: FastAPI):
     """
     Function that handles startup and shutdown events.
     To understand more, read https://fastapi.tiangolo.com/advanced/events/
+    Only the schema check blocks startup, caches are loaded by a background task and
+    /health/ready reports when they are.
     """
+    app.state.ready = False
+    app.state.warm_up_error = None
+    app.state.started = time.monotonic()
+    app.state.vocabulary_version = None
     try:
-        run_migrations(DB_URL)
-        init_db_session(DB_URL.replace("postgresql", "postgresql+asyncpg"))
+        with startup_phases.phase("engine"):
+            manager = init_db_session(DB_URL.replace("postgresql", "postgresql+asyncpg"))
+        instrument_engine(manager._engine.sync_engine)
+        app.state.db = manager
+        with startup_phases.phase("migrations"):
+            await migrate(manager, DB_URL)
+        history_writer.start(manager)
     except Exception as e:
         logger.error(f"Error connecting to DB: {e}")
         sys.exit(1)
+    warm_up_task = asyncio.create_task(warm_up(app, manager))
+    watch_task = asyncio.create_task(watch_vocabulary(app, manager))
+    metrics_task = asyncio.create_task(write_metrics())
     yield
-    if sessionmanager._engine is not None:
-        await sessionmanager.close()
+    warm_up_task.cancel()
+    watch_task.cancel()
+    metrics_task.cancel()
+    host_executor.shutdown()
+    await history_writer.stop()
+    registry.write_snapshot()
+    if manager._engine is not None:
+        await manager.close()
+
+
+async def require_ready(request: Request):
+    if not request.app.state.ready:
+        raise HTTPException(status_code=503, detail="Warming up", headers={"Retry-After": "1"})
+
+
+async def require_admin(authorization: str = Header("")):
+    """Bearer ADMIN_TOKEN, admin endpoints are disabled while it is not configured."""
+    expected = f"Bearer {ADMIN_TOKEN}".encode()
+    if not ADMIN_TOKEN or not hmac.compare_digest(authorization.encode(), expected):
+        raise HTTPException(status_code=403, detail="Admin token required")
 
 
 app = FastAPI(lifespan=lifespan)
@@ -51,16 +176,105 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(TimingMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+
+def is_live() -> bool:
+    """False once warm up has kept failing for WARM_UP_TIMEOUT, so the worker gets restarted."""
+    if app.state.ready or app.state.warm_up_error is None:
+        return True
+    return time.monotonic() - app.state.started < WARM_UP_TIMEOUT
 
 
 @app.get("/health")
 async def health():
-    return
+    return {"live": is_live(), "ready": app.state.ready}
+
+
+@app.get("/health/live")
+async def health_live():
+    live = is_live()
+    body = {"live": live, "error": app.state.warm_up_error}
+    return JSONResponse(body, status_code=200 if live else 503)
+
+
+@app.get("/health/ready")
+async def health_ready():
+    """200 once the caches are warm, 503 before, for load balancer readiness probes."""
+    body = {"ready": app.state.ready, "error": app.state.warm_up_error}
+    return JSONResponse(body, status_code=200 if app.state.ready else 503)
 
 
-app.include_router(game.router, prefix="/v1", tags=["game"])
+@app.post("/vocabulary/reload", dependencies=[Depends(require_admin)])
+async def reload_vocabulary(request: Request, db: AsyncSession = Depends(get_db_session)):
+    """Reload the in-memory vocabulary after the `vocabularies` table changed.
+
+    This worker reloads right away; advancing `vocabulary_version` makes the other workers follow
+    within VOCABULARY_CHECK_SECONDS.
+    """
+    await Vocabulary.bump_version(db)
+    index = await reload_worker_vocabulary(request.app, db)
+    return {
+        "words": len(index),
+        "lengths": index.lengths(),
+        "version": request.app.state.vocabulary_version,
+    }
+
+
+@app.get("/stats/vocabulary")
+async def get_vocabulary_stats():
+    index = get_vocab_index()
+    return {
+        "version": app.state.vocabulary_version,
+        "words": len(index),
+        "lengths": {n: len(index.words[n]) for n in index.lengths()},
+        "weighted_lengths": sorted(index.alias_tables),
+    }
+
+
+@app.get("/stats/db")
+async def get_db_stats():
+    return {**app.state.db.pool_stats(), "history_writer": history_writer.stats()}
+
+
+@app.get("/stats/executor")
+async def get_executor_stats():
+    return host_executor.stats()
+
+
+@app.get("/stats/cache")
+async def get_cache_stats():
+    return {
+        **cache_stats(),
+        "decisions": transposition_table.stats(),
+        "games": game_cache.stats(),
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text format, summed over all workers sharing METRICS_DIR."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/stats/logging")
+async def get_logging_stats():
+    """Log records dropped by sampling or because the log queue was full."""
+    return logging_stats()
+
+
+@app.get("/stats/startup")
+async def get_startup_stats():
+    """Seconds spent in each startup phase of this process."""
+    return {"ready": app.state.ready, "phases": startup_phases.report()}
+
+
+app.include_router(game.router, prefix="/v1", tags=["game"], dependencies=[Depends(require_ready)])
 
 
 if __name__ == "__main__":
+    import uvicorn
+
     realod = ENV == "dev"
     uvicorn.run("server:app", host="0.0.0.0", port=8010, reload=realod, log_config=logger_config)
@@ -0,0 +1,76 @@
+# Benchmark the host rules against each other on random pools from the vocabulary file.
+# Usage (from server/): PYTHONPATH=. python src/bench_host_rule.py [--matrix data/feedback]
+import argparse
+import random
+import statistics
+import time
+
+from src.feedback_matrix import load_feedback_matrices
+from src.game_guess import (
+    update_candidate_by_host_cheating_rule,
+    update_candidate_by_host_cheating_rule_reference,
+    update_candidate_by_pattern_bucket,
+)
+
+RULES = {
+    "cheating (reference)": update_candidate_by_host_cheating_rule_reference,
+    "cheating": update_candidate_by_host_cheating_rule,
+    "bucket": update_candidate_by_pattern_bucket,
+}
+
+
+class Record:
+    def __init__(self, word: str, hint: str):
+        self.word = word
+        self.hint = hint
+
+
+def play(rule, vocab: list[str], pool_size: int, attempts: int, rng: random.Random) -> list[float]:
+    """Time every submit of one game of `attempts` random guesses."""
+    candidates = rng.sample(vocab, pool_size)
+    history = []
+    timings = []
+    for _ in range(attempts):
+        guess = rng.choice(vocab)
+        start = time.perf_counter()
+        try:
+            hint, candidates = rule(history, guess, candidates)
+        except IndexError:
+            # the reference rule cannot pick from an empty lowest list
+            break
+        timings.append(time.perf_counter() - start)
+        history.append(Record(guess, hint))
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the host rules")
+    parser.add_argument("--words", default="alembic/vocab/words.txt")
+    parser.add_argument("--matrix", help="directory of prebuilt feedback matrices")
+    parser.add_argument("--pools", default="9,100,1000,14855")
+    parser.add_argument("--games", type=int, default=5)
+    parser.add_argument("--attempts", type=int, default=6)
+    parser.add_argument("--skip-reference", action="store_true")
+    args = parser.parse_args()
+
+    if args.matrix:
+        load_feedback_matrices(args.matrix)
+    with open(args.words) as f:
+        vocab = [line.strip().lower() for line in f if line.strip()]
+
+    print(f"{'rule':<22}{'pool':>8}{'submits':>9}{'mean ms':>10}{'p95 ms':>10}")
+    for pool_size in map(int, args.pools.split(",")):
+        pool_size = min(pool_size, len(vocab))
+        for name, rule in RULES.items():
+            if args.skip_reference and rule is update_candidate_by_host_cheating_rule_reference:
+                continue
+            rng = random.Random(pool_size)
+            timings = []
+            for _ in range(args.games):
+                timings += play(rule, vocab, pool_size, args.attempts, rng)
+            timings = sorted(t * 1000 for t in timings)
+            p95 = timings[int(0.95 * (len(timings) - 1))]
+            print(
+                f"{name:<22}{pool_size:>8}{len(timings):>9}"
+                f"{statistics.mean(timings):>10.2f}{p95:>10.2f}"
+            )
@@ -0,0 +1,51 @@
+# Packed storage of candidate sets for `games.answer` and `game_history.answer`.
+# A packed set is one format byte followed by either the sorted vocabulary ordinals as raw
+# little-endian uint16/uint32 (read back with `np.frombuffer`, no copy), a bitset over the
+# ordinals for dense sets, or comma-joined text when a word is not in the vocabulary.
+from collections.abc import Sequence
+
+import numpy as np
+from src.word_mask import WordTable
+
+TEXT = 0
+IDS16 = 1
+IDS32 = 2
+BITSET = 3
+
+ID_DTYPES = {IDS16: np.dtype("<u2"), IDS32: np.dtype("<u4")}
+
+
+def pack_ids(table: WordTable, ids: np.ndarray) -> bytes:
+    ids = np.unique(ids)
+    if ids.size and ids[-1] >= table.num_vocab:
+        return bytes([TEXT]) + ",".join(table.lookup(ids)).encode()
+
+    fmt = IDS16 if not ids.size or ids[-1] <= np.iinfo(np.uint16).max else IDS32
+    raw = ids.astype(ID_DTYPES[fmt]).tobytes()
+    if ids.size:
+        bits = np.zeros(ids[-1] + 1, dtype=bool)
+        bits[ids] = True
+        bitset = np.packbits(bits, bitorder="little").tobytes()
+        if len(bitset) < len(raw):
+            return bytes([BITSET]) + bitset
+    return bytes([fmt]) + raw
+
+
+def unpack_ids(table: WordTable, data: bytes) -> np.ndarray:
+    fmt = data[0]
+    if fmt in ID_DTYPES:
+        return np.frombuffer(data, dtype=ID_DTYPES[fmt], offset=1)
+    if fmt == BITSET:
+        bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8, offset=1), bitorder="little")
+        return np.flatnonzero(bits)
+    if fmt == TEXT:
+        return np.sort(table.ids(data[1:].decode().split(",")))
+    raise ValueError(f"Unknown packed candidates format: {fmt}")
+
+
+def pack_words(table: WordTable, words: Sequence[str]) -> bytes:
+    return pack_ids(table, table.ids(words))
+
+
+def unpack_words(table: WordTable, data: bytes) -> list[str]:
+    return table.lookup(unpack_ids(table, data))
@@ -0,0 +1,68 @@
+# Positional inverted index over the words of one length.
+# Every (position, letter) pair and every letter has a posting bitset over the word ordinals, packed
+# into uint64 words, so "all words consistent with these hints" is a few AND/ANDNOT passes over
+# n/64 integers per constraint instead of a scan of the words.
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+from config import Hint
+from src.word_mask import ALPHABET, encode_letters
+
+
+def pack_bits(bits: np.ndarray) -> np.ndarray:
+    """Bool array (..., N) to uint64 bitsets (..., ceil(N / 64)), bit i is word i."""
+    packed = np.packbits(bits, axis=-1, bitorder="little")
+    pad = -packed.shape[-1] % 8
+    if pad:
+        packed = np.concatenate([packed, np.zeros((*packed.shape[:-1], pad), np.uint8)], axis=-1)
+    return packed.view(np.uint64)
+
+
+def unpack_bits(bitset: np.ndarray, size: int) -> np.ndarray:
+    return np.flatnonzero(np.unpackbits(bitset.view(np.uint8), count=size, bitorder="little"))
+
+
+class PositionalIndex:
+    def __init__(self, words: Sequence[str], length: int):
+        letters = encode_letters(words) if words else np.empty((0, length), dtype=np.uint8)
+        self.size = len(words)
+        self.length = length
+        alphabet = np.arange(ALPHABET, dtype=np.uint8)
+        # (L, 26, W): words with `letter` at `position`
+        self.at = pack_bits(letters.T[:, None, :] == alphabet[None, :, None])
+        # (26, W): words containing `letter`
+        self.has = np.bitwise_or.reduce(self.at, axis=0)
+        self.all = pack_bits(np.ones(self.size, dtype=bool))
+
+    def match(self, maps: Mapping[str, str]) -> np.ndarray:
+        """Bitset of the words consistent with every (word, hint) in `maps`.
+
+        Same rules as `Vocabulary.get_random_word_by_length`: HIT fixes the letter at the
+        position, PRESENT requires the letter elsewhere, MISS excludes the letter.
+        """
+        out = self.all.copy()
+        for word, hint in maps.items():
+            for idx, (char, symbol) in enumerate(zip(word, hint)):
+                c = ord(char) - ord("a")
+                if not 0 <= c < ALPHABET:
+                    # no word contains the letter
+                    if symbol != Hint.MISS.value:
+                        out[:] = 0
+                elif symbol == Hint.HIT.value:
+                    out &= self.at[idx, c] if idx < self.length else 0
+                elif symbol == Hint.PRESENT.value:
+                    out &= self.has[c] & ~self.at[idx, c] if idx < self.length else self.has[c]
+                elif symbol == Hint.MISS.value:
+                    out &= ~self.has[c]
+        return out
+
+    def ids(self, maps: Mapping[str, str]) -> np.ndarray:
+        """Ordinals of the words consistent with `maps`, ascending."""
+        return unpack_bits(self.match(maps), self.size)
+
+    def count(self, maps: Mapping[str, str]) -> int:
+        return int(np.bitwise_count(self.match(maps)).sum())
+
+    @property
+    def nbytes(self) -> int:
+        return self.at.nbytes + self.has.nbytes + self.all.nbytes
@@ -0,0 +1,117 @@
+# Vectorized hint engine: scores one guess against a whole candidate pool at once.
+# Words are encoded as (N, L) uint8 arrays of ascii letter codes, hints as (N, L) arrays of
+# hint codes (MISS=0, PRESENT=1, HIT=2). `src.game_guess` keeps the per-pair reference functions.
+from collections.abc import Sequence
+
+import numpy as np
+from config import BucketPolicy, Hint
+
+MISS, PRESENT, HIT = 0, 1, 2
+HINT_CODES = {Hint.MISS.value: MISS, Hint.PRESENT.value: PRESENT, Hint.HIT.value: HIT}
+HINT_BYTES = np.frombuffer(
+    (Hint.MISS.value + Hint.PRESENT.value + Hint.HIT.value).encode("ascii"), dtype=np.uint8
+)
+SCORES = np.array([0, 1, 10], dtype=np.uint16)
+
+
+def encode_words(words: Sequence[str]) -> np.ndarray:
+    """Encode equal-length words as an (N, L) uint8 array."""
+    if len(words) == 0:
+        return np.empty((0, 0), dtype=np.uint8)
+    buf = np.frombuffer("".join(words).encode("ascii"), dtype=np.uint8)
+    return buf.reshape(len(words), -1)
+
+
+def encode_word(word: str) -> np.ndarray:
+    return np.frombuffer(word.encode("ascii"), dtype=np.uint8)
+
+
+def encode_hint(hint: str) -> np.ndarray:
+    return np.array([HINT_CODES[h] for h in hint], dtype=np.uint8)
+
+
+def decode_hints(codes: np.ndarray) -> list[str]:
+    """Turn an (N, L) array of hint codes back into hint strings."""
+    if codes.size == 0:
+        return [""] * len(codes)
+    length = codes.shape[1]
+    text = HINT_BYTES[codes].tobytes().decode("ascii")
+    return [text[i : i + length] for i in range(0, len(text), length)]
+
+
+def contains_letters(words: np.ndarray, letters: np.ndarray) -> np.ndarray:
+    """(N, K) bool: whether each word contains each of `letters` anywhere."""
+    return (words[:, :, None] == letters[None, None, :]).any(axis=1)
+
+
+def compare_batch(guess: str, candidates: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized `compare_two_words(guess, candidate)` for every candidate row.
+
+    Returns (hint codes of shape (N, L), scores of shape (N,)).
+    """
+    return compare_encoded(encode_word(guess), candidates)
+
+
+def compare_encoded(g: np.ndarray, candidates: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """`compare_batch` for a guess already encoded the same way as `candidates`."""
+    hit = candidates == g
+    present = contains_letters(candidates, g) & ~hit
+    codes = hit.astype(np.uint8) * HIT + present.astype(np.uint8) * PRESENT
+    return codes, score_codes(codes)
+
+
+def score_codes(codes: np.ndarray) -> np.ndarray:
+    return SCORES[codes].sum(axis=1, dtype=np.int32)
+
+
+def pattern_dtype(length: int) -> np.dtype:
+    """Smallest unsigned dtype that holds every base-3 pattern code of `length` letters."""
+    size = 3**length
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if size <= np.iinfo(dtype).max + 1:
+            return np.dtype(dtype)
+    return np.dtype(np.uint64)
+
+
+def pattern_codes(codes: np.ndarray) -> np.ndarray:
+    """Pack (N, L) hint codes into one base-3 integer per row (position 0 is least significant)."""
+    length = codes.shape[1] if codes.ndim == 2 else 0
+    dtype = pattern_dtype(length)
+    weights = (3 ** np.arange(length, dtype=np.uint64)).astype(dtype)
+    return (codes.astype(dtype) * weights).sum(axis=1, dtype=dtype)
+
+
+def unpack_pattern(code: int, length: int) -> np.ndarray:
+    out = np.empty(length, dtype=np.uint8)
+    for i in range(length):
+        code, out[i] = divmod(int(code), 3)
+    return out
+
+
+def unpack_patterns(patterns: np.ndarray, length: int) -> np.ndarray:
+    """Inverse of `pattern_codes`: (N,) base-3 codes back to (N, L) hint codes."""
+    weights = 3 ** np.arange(length, dtype=np.uint64)
+    return ((patterns.astype(np.uint64)[:, None] // weights) % 3).astype(np.uint8)
+
+
+def lowest_mask(scores: np.ndarray) -> np.ndarray:
+    if scores.size == 0:
+        return np.zeros(0, dtype=bool)
+    return scores == scores.min()
+
+
+def bucket_choices(patterns: np.ndarray, length: int, policy: BucketPolicy) -> np.ndarray:
+    """Group candidates by pattern code and return the codes of the buckets `policy` allows.
+
+    LARGEST breaks ties by lowest score and LOWEST_SCORE breaks ties by size, so both return
+    one bucket. RANDOM returns all of the largest buckets, to be picked from uniformly.
+    """
+    buckets, counts = np.unique(patterns, return_counts=True)
+    if policy == BucketPolicy.RANDOM:
+        return buckets[counts == counts.max()]
+    scores = score_codes(unpack_patterns(buckets, length))
+    if policy == BucketPolicy.LOWEST_SCORE:
+        order = np.lexsort((-counts, scores))
+    else:
+        order = np.lexsort((scores, -counts))
+    return buckets[order[:1]]
@@ -0,0 +1,205 @@
+# Runs host rules off the asyncio event loop.
+# Large candidate pools are evaluated in a thread or process pool with a per-call timeout, so one
+# heavy hard-mode guess does not block every other request on the worker. Small pools stay inline
+# where the executor hand-off would cost more than the rule itself.
+# Process workers are not forked from the server, which runs the log listener, the shard pool and
+# the host threads: a fork could inherit one of their locks held and deadlock. They start from a
+# forkserver (or spawn) and load the word tables and feedback matrices in an initializer.
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+from config import (
+    FEEDBACK_MATRIX_DIR,
+    HOST_EXECUTOR,
+    HOST_EXECUTOR_INLINE_BELOW,
+    HOST_EXECUTOR_START_METHOD,
+    HOST_EXECUTOR_TIMEOUT,
+    HOST_EXECUTOR_WORKERS,
+    LOG_LEVEL,
+)
+from middleware.timing import record
+from src.feedback_matrix import load_feedback_matrices
+from src.game_guess import HOST_RULES_IDS
+from src.metrics import host_rule_seconds, pool_bucket
+from src.word_mask import get_word_table, load_word_tables, vocabulary_words
+
+log = logging.getLogger(__name__)
+
+
+class HistoryRecord(NamedTuple):
+    word: str
+    hint: str
+
+
+def init_host_worker(vocabulary: dict[int, list[str]], matrix_dir: str) -> None:
+    """Build the word tables of the parent and memory-map the feedback matrices in a worker."""
+    # the server's log queue is not drained in this process, records go to its own stderr
+    logging.basicConfig(
+        level=LOG_LEVEL, format="%(asctime)s host-%(process)d %(levelname)s %(name)s %(message)s"
+    )
+    load_word_tables(vocabulary)
+    load_feedback_matrices(matrix_dir)
+
+
+def run_host_rule(
+    rule: str, history: list[HistoryRecord], guess: str, length: int, ids: np.ndarray, replay: bool
+) -> tuple[tuple[str, np.ndarray], float]:
+    """Evaluate a host rule against this process' word table, returning (result, seconds)."""
+    start = time.perf_counter()
+    result = HOST_RULES_IDS[rule](history, guess, get_word_table(length), ids, replay)
+    return result, time.perf_counter() - start
+
+
+class HostExecutor:
+    """Dispatches host rules to a "thread" or "process" pool, or runs them "inline".
+
+    Process workers are started with the vocabulary words of the parent's word tables and map the
+    same feedback matrix files, so vocabulary ids mean the same in both. Candidates with ids
+    outside the vocabulary only exist in the parent process and are evaluated in a thread instead.
+    """
+
+    def __init__(
+        self,
+        kind: str = HOST_EXECUTOR,
+        max_workers: int | None = HOST_EXECUTOR_WORKERS,
+        timeout: float | None = HOST_EXECUTOR_TIMEOUT,
+        inline_below: int = HOST_EXECUTOR_INLINE_BELOW,
+        start_method: str = HOST_EXECUTOR_START_METHOD,
+        matrix_dir: str = FEEDBACK_MATRIX_DIR,
+    ):
+        if kind not in ("inline", "thread", "process"):
+            raise ValueError(f"Unknown host executor: {kind}")
+        if start_method not in ("forkserver", "spawn"):
+            raise ValueError(f"Unsupported host worker start method: {start_method}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.inline_below = inline_below
+        self.start_method = start_method
+        self.matrix_dir = matrix_dir
+        self._pool: Executor | None = None
+        self._threads: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self.inline = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.run_seconds = 0.0
+        self.max_run_seconds = 0.0
+        self.wait_seconds = 0.0
+
+    def start(self) -> None:
+        if self.kind == "process":
+            context = multiprocessing.get_context(self.start_method)
+            if self.start_method == "forkserver":
+                # not the server's __main__, importing it would set up logging and the app
+                context.set_forkserver_preload([__name__])
+            self._pool = ProcessPoolExecutor(
+                self.max_workers,
+                mp_context=context,
+                initializer=init_host_worker,
+                initargs=(vocabulary_words(), self.matrix_dir),
+            )
+        if self.kind in ("thread", "process"):
+            self._threads = ThreadPoolExecutor(self.max_workers, thread_name_prefix="host")
+        if self._pool is None:
+            self._pool = self._threads
+
+    def restart(self) -> None:
+        """Swap in fresh pools, e.g. to start workers with a reloaded vocabulary.
+
+        Rules already submitted finish on the old pools, which are shut down without cancelling.
+        """
+        old = {self._pool, self._threads} - {None}
+        self._pool = self._threads = None
+        self.start()
+        for pool in old:
+            pool.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        for pool in {self._pool, self._threads} - {None}:
+            pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = self._threads = None
+
+    async def run(
+        self, rule: str, history, guess: str, length: int, ids: np.ndarray, replay: bool = True
+    ) -> tuple[str, np.ndarray]:
+        """Evaluate a host rule. Raises `TimeoutError` when the pool does not answer in time."""
+        records = [HistoryRecord(h.word, h.hint) for h in history]
+        if self._pool is None or len(ids) < self.inline_below:
+            self.inline += 1
+            result, seconds = run_host_rule(rule, records, guess, length, ids, replay)
+            host_rule_seconds.observe(seconds, rule, pool_bucket(len(ids)))
+            record("host_rule", seconds, f"{rule} inline on {len(ids)} candidates")
+            return result
+
+        pool = self._pool
+        if pool is not self._threads and ids.size and ids.max() >= get_word_table(length).num_vocab:
+            pool = self._threads
+
+        self._enter()
+        start = time.perf_counter()
+        try:
+            future = asyncio.get_running_loop().run_in_executor(
+                pool, run_host_rule, rule, records, guess, length, ids, replay
+            )
+            result, seconds = await asyncio.wait_for(future, self.timeout)
+        except TimeoutError:
+            self.timeouts += 1
+            log.warning(f"Host rule {rule} timed out after {self.timeout}s on {len(ids)} ids")
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self._exit()
+        self.completed += 1
+        host_rule_seconds.observe(seconds, rule, pool_bucket(len(ids)))
+        waited = time.perf_counter() - start - seconds
+        # the rule ran in another thread or process, outside the request context
+        record("host_wait", waited, f"{self.kind} pool")
+        record("host_rule", seconds, f"{rule} on {len(ids)} candidates")
+        self.run_seconds += seconds
+        self.max_run_seconds = max(self.max_run_seconds, seconds)
+        self.wait_seconds += waited
+        return result
+
+    def _enter(self) -> None:
+        with self._lock:
+            self.submitted += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _exit(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def stats(self) -> dict[str, int | float | str | None]:
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "timeout": self.timeout,
+            "inline_below": self.inline_below,
+            "inline": self.inline,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "run_seconds": self.run_seconds,
+            "max_run_seconds": self.max_run_seconds,
+            "wait_seconds": self.wait_seconds,
+        }
+
+
+host_executor = HostExecutor()
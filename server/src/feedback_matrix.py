@@ -0,0 +1,177 @@
+# Precomputed guess x answer feedback matrices, one per word length.
+# Row g, column a holds the base-3 pattern code of `compare_two_words(words[g], words[a])`.
+# Matrices are written once by the build step below and memory-mapped read-only at startup, so
+# every uvicorn worker shares the same page cache and a lookup is a single array index.
+import argparse
+import logging
+import os
+from collections.abc import Sequence
+from pathlib import Path
+
+import numpy as np
+from config import FEEDBACK_MATRIX_DIR, FEEDBACK_MATRIX_MAX_BYTES
+from src.engine import (
+    compare_batch,
+    compare_encoded,
+    encode_words,
+    pattern_codes,
+    pattern_dtype,
+    score_codes,
+    unpack_patterns,
+)
+from src.hint_cache import row_cache
+from src.shard import shard_concat
+from src.word_mask import WordTable, encode_letters, get_word_table
+
+log = logging.getLogger(__name__)
+
+
+def matrix_path(directory: str | Path, length: int) -> Path:
+    return Path(directory) / f"feedback_{length}.npy"
+
+
+def words_path(directory: str | Path, length: int) -> Path:
+    return Path(directory) / f"words_{length}.txt"
+
+
+def matrix_nbytes(num_words: int, length: int) -> int:
+    return num_words * num_words * pattern_dtype(length).itemsize
+
+
+class FeedbackMatrix:
+    def __init__(self, words: list[str], matrix: np.ndarray):
+        self.words = words
+        self.length = len(words[0]) if words else 0
+        self.index = {w: i for i, w in enumerate(words)}
+        self.matrix = matrix
+        # word table whose first ids are exactly `words`, so its ids index the matrix directly
+        self.table: WordTable | None = None
+
+    @classmethod
+    def load(cls, directory: str | Path, length: int) -> "FeedbackMatrix":
+        words = words_path(directory, length).read_text().split()
+        matrix = np.load(matrix_path(directory, length), mmap_mode="r")
+        if matrix.shape != (len(words), len(words)):
+            raise ValueError(f"feedback matrix for length {length} does not match its word list")
+        return cls(words, matrix)
+
+
+_matrices: dict[int, FeedbackMatrix] = {}
+
+
+def load_feedback_matrices(
+    directory: str | Path = FEEDBACK_MATRIX_DIR,
+) -> dict[int, FeedbackMatrix]:
+    """Memory-map every matrix found in `directory`. Missing lengths fall back to the engine."""
+    _matrices.clear()
+    for path in sorted(Path(directory).glob("feedback_*.npy")):
+        length = int(path.stem.split("_")[1])
+        try:
+            matrix = FeedbackMatrix.load(directory, length)
+        except (OSError, ValueError) as e:
+            log.error(f"Skip feedback matrix {path}: {e}")
+            continue
+        table = get_word_table(length)
+        table.add(matrix.words)
+        if table.words[: len(matrix.words)] == matrix.words:
+            matrix.table = table
+        _matrices[length] = matrix
+    log.info(f"Loaded feedback matrices for lengths: {sorted(_matrices)}")
+    return _matrices
+
+
+def get_feedback_matrix(length: int) -> FeedbackMatrix | None:
+    return _matrices.get(length)
+
+
+def _matrix_patterns(guess: str, table: WordTable, ids: np.ndarray) -> np.ndarray | None:
+    matrix = get_feedback_matrix(table.length)
+    if matrix is None or matrix.table is not table or guess not in matrix.index:
+        return None
+    if ids.size and ids.max() >= len(matrix.words):
+        return None
+    return matrix.matrix[matrix.index[guess], ids]
+
+
+def _cached_patterns(guess: str, table: WordTable, ids: np.ndarray) -> np.ndarray:
+    """Patterns from a cached row of `guess` against the whole table, computed on a miss."""
+    key = (table, guess)
+    row = row_cache.get(key)
+    if row is None or (ids.size and ids.max() >= len(row)):
+        g = encode_letters([guess])[0]
+        row = shard_concat(
+            lambda letters: pattern_codes(compare_encoded(g, letters)[0]), table.letters
+        )
+        row_cache.put(key, row)
+    return row[ids]
+
+
+def pattern_ids(guess: str, table: WordTable, ids: np.ndarray) -> np.ndarray:
+    """Pattern codes of `guess` against the words `ids` of `table`."""
+    patterns = _matrix_patterns(guess, table, ids)
+    if patterns is None:
+        patterns = _cached_patterns(guess, table, ids)
+    return patterns
+
+
+def compare_ids(guess: str, table: WordTable, ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Hint codes and scores of `guess` against the words `ids` of `table`."""
+
+    def unpack(patterns: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        codes = unpack_patterns(patterns, table.length)
+        return codes, score_codes(codes)
+
+    return shard_concat(unpack, pattern_ids(guess, table, ids))
+
+
+def build_matrix(words: Sequence[str], path: str | Path) -> None:
+    """Write the pattern matrix of `words` to `path` as a .npy file, one guess row at a time."""
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.tmp")
+    pool = encode_words(words)
+    dtype = pattern_dtype(pool.shape[1])
+    out = np.lib.format.open_memmap(tmp, mode="w+", dtype=dtype, shape=(len(words), len(words)))
+    for row, guess in enumerate(words):
+        codes, _ = compare_batch(guess, pool)
+        out[row] = pattern_codes(codes)
+    out.flush()
+    del out
+    os.replace(tmp, path)
+
+
+def build_feedback_matrices(
+    words: Sequence[str],
+    directory: str | Path = FEEDBACK_MATRIX_DIR,
+    max_bytes: int = FEEDBACK_MATRIX_MAX_BYTES,
+) -> list[int]:
+    """Build one matrix per word length, skipping lengths larger than `max_bytes`."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    by_length: dict[int, list[str]] = {}
+    for word in sorted(set(words)):
+        by_length.setdefault(len(word), []).append(word)
+
+    built = []
+    for length, bucket in sorted(by_length.items()):
+        size = matrix_nbytes(len(bucket), length)
+        if size > max_bytes:
+            log.warning(f"Skip length {length}: {size} bytes exceeds the {max_bytes} byte limit")
+            continue
+        words_path(directory, length).write_text("\n".join(bucket) + "\n")
+        build_matrix(bucket, matrix_path(directory, length))
+        built.append(length)
+    return built
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Build feedback matrices from a word list")
+    parser.add_argument("--words", default="alembic/vocab/words.txt")
+    parser.add_argument("--out", default=FEEDBACK_MATRIX_DIR)
+    parser.add_argument("--max-bytes", type=int, default=FEEDBACK_MATRIX_MAX_BYTES)
+    args = parser.parse_args()
+
+    with open(args.words) as f:
+        vocab = [line.strip().lower() for line in f if line.strip()]
+    lengths = build_feedback_matrices(vocab, args.out, args.max_bytes)
+    log.info(f"Built feedback matrices for lengths {lengths} in {args.out}")
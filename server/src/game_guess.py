@@ -1,7 +1,29 @@
 import logging
 import random
-
-from config import Hint
+from functools import partial
+
+import numpy as np
+from config import BUCKET_POLICY, BucketPolicy, Hint, HostRule
+from middleware.custom_logging import SAMPLED
+from src.engine import (
+    bucket_choices,
+    decode_hints,
+    encode_hint,
+    lowest_mask,
+    pattern_codes,
+    unpack_patterns,
+)
+from src.feedback_matrix import compare_ids, pattern_ids
+from src.hint_cache import pair_cache
+from src.shard import shard_concat
+from src.transposition import Decision, decision_key, transposition_table
+from src.word_mask import (
+    WordTable,
+    common_letter_hint_ids,
+    filter_by_history_ids,
+    get_word_table,
+    refine_by_highest_ids,
+)
 
 log = logging.getLogger(__name__)
 
@@ -21,14 +43,16 @@ def compare_two_words(word: str, ref: str) -> list[str, int]:
     return hint, score
 
 
+def compare_two_words_cached(word: str, ref: str) -> tuple[str, int]:
+    return pair_cache.get_or_compute((word, ref), lambda: compare_two_words(word, ref))
+
+
 def get_highest_words(word: str, candidates: list[str]) -> list[list[str], list[str]]:
     highest = []
     highest_score = 0
     highest_hint = []
     for candidate in candidates:
         hint, score = compare_two_words(word, candidate)
-        log.debug(f"{word=} {candidate=}, {hint=}, {score=}")
-        print(f"{word=} {candidate=}, {hint=}, {score=}")
         if score > highest_score:
             highest = [candidate]
             highest_score = score
@@ -53,7 +77,7 @@ def filter_candidates(word: str, hint: str, candidates: list[str]) -> list[str]:
 
     for d in drop:
         update.remove(d)
-    log.debug(f"{drop=} {update=}")
+    log.debug("drop=%s update=%s", drop, update, extra=SAMPLED)
     return update
 
 
@@ -72,7 +96,7 @@ def filter_by_history(word: str, hint: str, candidates: list[str]) -> list[str]:
 
     for d in drop:
         update.remove(d)
-    log.debug(f"filter_by_history: {drop=} {update=}")
+    log.debug("filter_by_history: drop=%s update=%s", drop, update, extra=SAMPLED)
     return update
 
 
@@ -92,10 +116,170 @@ def get_lowest_words(guess, words_list) -> list[list[str], list[str]]:
     return lowest, lowest_hint
 
 
-def update_candidate_by_host_cheating_rule(history, guess, candidates) -> list[str, list[str]]:
+def apply_history_ids(constraints, table: WordTable, ids: np.ndarray) -> np.ndarray:
+    """Keep the candidates that do not violate any of the `constraints` history records."""
+    for record in constraints:
+        ids = shard_concat(partial(filter_by_history_ids, table, record.word, record.hint), ids)
+    return ids
+
+
+def cheating_decision(
+    history, guess: str, table: WordTable, ids: np.ndarray, replay: bool = True
+) -> Decision:
+    # Same rule as `update_candidate_by_host_cheating_rule_reference`, evaluated on the whole
+    # candidate pool at once
+    num_candidates = len(ids)
+    ids = apply_history_ids(history if replay else history[-1:], table, ids)
+    log.debug("history: %d of %d candidates remain", len(ids), num_candidates)
+
+    if len(ids) > 1:
+        codes, scores = compare_ids(guess, table, ids)
+        keep = refine_by_highest_ids(guess, codes, scores, table, ids)
+        if keep.any():
+            ids = ids[keep]
+        else:
+            # Random pick from lowest scoring words, excluding the highest scoring ones
+            rest = scores < scores.max()
+            if not rest.any():
+                rest = np.ones(len(ids), dtype=bool)
+            lowest = np.flatnonzero(rest)[lowest_mask(scores[rest])]
+            hints = decode_hints(codes[lowest])
+            return Decision(tuple((hint, ids[[i]]) for hint, i in zip(hints, lowest)))
+
+    log.debug("final candidates: %d", len(ids))
+    if len(ids) == 1:
+        hint, _ = compare_two_words_cached(guess, table.words[ids[0]])
+    else:
+        hint = common_letter_hint_ids(guess, table, ids)
+    log.debug("update hint: %s", hint)
+    return Decision(((hint, ids),))
+
+
+def bucket_decision(
+    history,
+    guess: str,
+    table: WordTable,
+    ids: np.ndarray,
+    replay: bool = True,
+    policy: BucketPolicy | str = BUCKET_POLICY,
+) -> Decision:
+    if replay:
+        for record in history:
+            hint = pattern_codes(encode_hint(record.hint)[None, :])[0]
+            ids = ids[pattern_ids(record.word, table, ids) == hint]
+    patterns = pattern_ids(guess, table, ids)
+    buckets = bucket_choices(patterns, len(guess), BucketPolicy(policy))
+    hints = decode_hints(unpack_patterns(buckets, len(guess)))
+    log.debug("buckets: %s", hints)
+    return Decision(tuple((hint, ids[patterns == b]) for hint, b in zip(hints, buckets)))
+
+
+def _answer_directly(history, guess: str, table: WordTable, ids: np.ndarray):
+    """Hint for a repeated guess or a single candidate, which need no host decision."""
+    for h in history:
+        if guess == h.word:
+            log.debug("Found guess in history: %s", h)
+            return h.hint, ids
+
+    if len(ids) == 1:
+        # Normal wordle game comparison
+        hint, _ = compare_two_words_cached(guess, table.words[ids[0]])
+        return hint, ids
+    return None
+
+
+def host_cheating_rule_ids(
+    history, guess: str, table: WordTable, ids: np.ndarray, replay: bool = True
+) -> tuple[str, np.ndarray]:
+    """Cheating host rule over vocabulary ids of `table`.
+
+    `ids` returned by the previous submit already satisfy every earlier hint, so with
+    `replay=False` only the newest history record is applied to them. `replay=True` re-filters
+    against the whole history, for candidates that did not come from the previous submit.
+    Decisions are memoized in the transposition table.
+    """
+    constraints = history if replay else history[-1:]
+    if any(guess == h.word for h in history):
+        # the next submit only applies its own newest record, so the pending one is applied
+        # here before the candidates are carried forward
+        ids = apply_history_ids(constraints, table, ids)
+    answer = _answer_directly(history, guess, table, ids)
+    if answer is not None:
+        return answer
+
+    key = decision_key(HostRule.CHEATING.value, table, ids, guess, constraints)
+    decision = transposition_table.get_or_compute(
+        key, lambda: cheating_decision(history, guess, table, ids, replay)
+    )
+    return decision.pick()
+
+
+def pattern_bucket_ids(
+    history,
+    guess: str,
+    table: WordTable,
+    ids: np.ndarray,
+    replay: bool = True,
+    policy: BucketPolicy | str = BUCKET_POLICY,
+) -> tuple[str, np.ndarray]:
+    """Host rule that groups candidates by the hint the guess would get, in a single pass.
+
+    Candidates returned by the previous submit are already consistent with every earlier hint,
+    so the bucket picked by `policy` becomes the new candidate set and its pattern is the hint.
+    `replay=True` first keeps only the candidates that reproduce every hint in `history`.
+    Decisions are memoized in the transposition table.
+    """
+    answer = _answer_directly(history, guess, table, ids)
+    if answer is not None:
+        return answer
+
+    rule = f"{HostRule.BUCKET.value}:{BucketPolicy(policy).value}"
+    constraints = history if replay else []
+    key = decision_key(rule, table, ids, guess, constraints)
+    decision = transposition_table.get_or_compute(
+        key, lambda: bucket_decision(history, guess, table, ids, replay, policy)
+    )
+    return decision.pick()
+
+
+def update_candidate_by_host_cheating_rule(
+    history, guess, candidates, replay: bool = True
+) -> list[str, list[str]]:
+    table = get_word_table(len(guess))
+    hint, ids = host_cheating_rule_ids(history, guess, table, table.ids(candidates), replay)
+    return hint, table.lookup(ids)
+
+
+def update_candidate_by_pattern_bucket(
+    history,
+    guess,
+    candidates,
+    replay: bool = True,
+    policy: BucketPolicy | str = BUCKET_POLICY,
+) -> list[str, list[str]]:
+    table = get_word_table(len(guess))
+    hint, ids = pattern_bucket_ids(history, guess, table, table.ids(candidates), replay, policy)
+    return hint, table.lookup(ids)
+
+
+HOST_RULES = {
+    HostRule.CHEATING.value: update_candidate_by_host_cheating_rule,
+    HostRule.BUCKET.value: update_candidate_by_pattern_bucket,
+}
+
+# Same rules over vocabulary id arrays, for callers that keep candidates packed
+HOST_RULES_IDS = {
+    HostRule.CHEATING.value: host_cheating_rule_ids,
+    HostRule.BUCKET.value: pattern_bucket_ids,
+}
+
+
+def update_candidate_by_host_cheating_rule_reference(
+    history, guess, candidates
+) -> list[str, list[str]]:
     for h in history:
         if guess == h.word:
-            log.debug(f"Found guess in history: {h}")
+            log.debug("Found guess in history: %s", h)
             hint = h.hint
             return hint, candidates
 
@@ -112,7 +296,7 @@ def update_candidate_by_host_cheating_rule(history, guess, candidates) -> list[s
         remain = filter_by_history(record.word, record.hint, update)
         update = update.intersection(remain)
     candidates = list(update)
-    log.debug(f"history: {update=}")
+    log.debug("history: %s", update, extra=SAMPLED)
 
     if len(candidates) > 1:
         # Filter candidates by highest score words
@@ -122,7 +306,7 @@ def update_candidate_by_host_cheating_rule(history, guess, candidates) -> list[s
             remain = filter_candidates(highest[i], hint[i], update)
             update = update.intersection(remain)
         update = list(update)
-        log.debug(f"highest: {update=}")
+        log.debug("highest: %s", update, extra=SAMPLED)
 
         if len(update) > 0:
             candidates = update
@@ -130,11 +314,11 @@ def update_candidate_by_host_cheating_rule(history, guess, candidates) -> list[s
             update = list(candidates)
             [update.remove(h) for h in highest]
             lowest, _ = get_lowest_words(guess, update)
-            log.debug(f"lowest: {lowest=}")
+            log.debug("lowest: %s", lowest, extra=SAMPLED)
             candidates = [random.choice(lowest)]
-        log.debug(f"remaining: {candidates=}")
+        log.debug("remaining: %s", candidates, extra=SAMPLED)
 
-    log.debug(f"final candidates: {candidates=}")
+    log.debug("final candidates: %s", candidates, extra=SAMPLED)
     if len(candidates) == 1:
         hint, _ = compare_two_words(word=guess, ref=candidates[0])
         return hint, candidates
@@ -146,7 +330,7 @@ def update_candidate_by_host_cheating_rule(history, guess, candidates) -> list[s
         if all(w in c for c in candidates):
             hint[i] = Hint.PRESENT.value
     hint = "".join(hint)
-    log.debug(f"update hint: {hint=}")
+    log.debug("update hint: %s", hint)
     return hint, candidates
 
 
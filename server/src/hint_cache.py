@@ -0,0 +1,135 @@
+# Process-wide, size-bounded caches for hint results.
+# `pair_cache` holds (guess, answer) -> (hint, score) from `compare_two_words`, `row_cache` holds
+# the pattern codes of one guess against every word of a word table, which is the on-the-fly
+# replacement of a feedback matrix row for lengths without a precomputed matrix.
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+import numpy as np
+from config import (
+    HINT_CACHE_EVICTION,
+    HINT_CACHE_MAX_BYTES,
+    HINT_CACHE_PAIRS,
+    HINT_CACHE_ROWS,
+)
+
+
+def sizeof(value: Any) -> int:
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, tuple):
+        return sys.getsizeof(value) + sum(sys.getsizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class BoundedCache:
+    """Thread-safe cache bounded by entry count and approximate bytes.
+
+    `eviction="lru"` drops the least recently used entry first, `eviction="fifo"` the oldest
+    inserted one. With `ttl`, entries also expire that many seconds after they were put.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        max_bytes: int | None = None,
+        eviction: str = "lru",
+        sizeof: Callable[[Any], int] = sizeof,
+        ttl: float | None = None,
+    ):
+        if eviction not in ("lru", "fifo"):
+            raise ValueError(f"Unknown eviction policy: {eviction}")
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.eviction = eviction
+        self._sizeof = sizeof
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[Any, int, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[2] < time.monotonic():
+                del self._data[key]
+                self.bytes -= item[1]
+                self.expirations += 1
+                item = None
+            if item is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            if self.eviction == "lru":
+                self._data.move_to_end(key)
+            return item[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        size = self._sizeof(value)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            if self.capacity <= 0 or (self.max_bytes is not None and size > self.max_bytes):
+                return
+            expires = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+            self._data[key] = (value, size, expires)
+            self.bytes += size
+            while len(self._data) > self.capacity or (
+                self.max_bytes is not None and self.bytes > self.max_bytes
+            ):
+                _, (_, evicted, _) = self._data.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            item = self._data.pop(key, None)
+            if item is not None:
+                self.bytes -= item[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "capacity": self.capacity,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+pair_cache = BoundedCache(HINT_CACHE_PAIRS, eviction=HINT_CACHE_EVICTION)
+row_cache = BoundedCache(HINT_CACHE_ROWS, HINT_CACHE_MAX_BYTES, eviction=HINT_CACHE_EVICTION)
+
+
+def cache_stats() -> dict[str, dict[str, int | float]]:
+    return {"pairs": pair_cache.stats(), "rows": row_cache.stats()}
@@ -0,0 +1,200 @@
+# Prometheus-style counters and histograms, rendered in the text exposition format on /metrics.
+# Every server process keeps its own values. With several workers, set METRICS_DIR to a directory
+# shared by the workers of one deployment (and emptied when it starts): each worker writes a
+# snapshot of its values there every METRICS_FLUSH_SECONDS, and /metrics sums the snapshots of
+# all workers, so any worker can answer a scrape. Snapshots of exited workers are kept, so
+# counters never go backwards.
+import bisect
+import json
+import math
+import os
+import threading
+from collections.abc import Sequence
+from pathlib import Path
+
+from config import METRICS_DIR
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def pool_bucket(size: int) -> str:
+    """Order of magnitude label of a candidate pool size: "<10", "<100", ..., ">=100000"."""
+    for bound in (10, 100, 1000, 10_000, 100_000):
+        if size < bound:
+            return f"<{bound}"
+    return ">=100000"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def snapshot(self) -> dict[tuple[str, ...], float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # per label values: count per bucket (the last one is +Inf), then the sum
+        self._values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            values = self._values.get(labels)
+            if values is None:
+                values = self._values[labels] = [0] * (len(self.buckets) + 2)
+            values[i] += 1
+            values[-1] += value
+
+    def snapshot(self) -> dict[tuple[str, ...], list[float]]:
+        with self._lock:
+            return {labels: list(values) for labels, values in self._values.items()}
+
+
+class Registry:
+    def __init__(self, directory: str | Path | None = METRICS_DIR or None):
+        self.metrics: dict[str, Counter | Histogram] = {}
+        self.directory = Path(directory) if directory else None
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def _register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def snapshot(self) -> dict[str, list]:
+        """JSON-serializable values of this process: {name: [[labels, value], ...]}."""
+        return {
+            name: [[list(labels), value] for labels, value in metric.snapshot().items()]
+            for name, metric in self.metrics.items()
+        }
+
+    def write_snapshot(self) -> None:
+        if self.directory is None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"metrics_{os.getpid()}.json"
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.snapshot()))
+        tmp.replace(path)
+
+    def collect(self) -> dict[str, dict[tuple[str, ...], float | list[float]]]:
+        """Values of this process, summed with the snapshots of the other workers."""
+        snapshots = [self.snapshot()]
+        if self.directory is not None and self.directory.is_dir():
+            own = f"metrics_{os.getpid()}.json"
+            for path in self.directory.glob("metrics_*.json"):
+                if path.name != own:
+                    try:
+                        snapshots.append(json.loads(path.read_text()))
+                    except (OSError, ValueError):
+                        # being replaced by its worker, picked up on the next scrape
+                        continue
+        totals: dict[str, dict] = {name: {} for name in self.metrics}
+        for snapshot in snapshots:
+            for name, values in snapshot.items():
+                if name not in totals:
+                    continue
+                merged = totals[name]
+                for labels, value in values:
+                    key = tuple(labels)
+                    if key not in merged:
+                        merged[key] = value
+                    elif isinstance(value, list):
+                        merged[key] = [a + b for a, b in zip(merged[key], value)]
+                    else:
+                        merged[key] += value
+        return totals
+
+    def render(self) -> str:
+        lines = []
+        for name, values in self.collect().items():
+            metric = self.metrics[name]
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for labels, value in sorted(values.items()):
+                pairs = list(zip(metric.labels, labels))
+                if metric.kind == "counter":
+                    lines.append(f"{name}{_labels(pairs)} {_number(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip((*metric.buckets, math.inf), value):
+                    cumulative += count
+                    le = "+Inf" if bound == math.inf else _number(bound)
+                    lines.append(f"{name}_bucket{_labels([*pairs, ('le', le)])} {cumulative}")
+                lines.append(f"{name}_sum{_labels(pairs)} {_number(value[-1])}")
+                lines.append(f"{name}_count{_labels(pairs)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(pairs: Sequence[tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    escaped = (
+        (k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for k, v in pairs
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+registry = Registry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by route and status", ("method", "route", "status")
+)
+http_request_seconds = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+)
+db_queries = registry.histogram(
+    "db_queries_per_request", "SQL statements executed per request", ("route",), COUNT_BUCKETS
+)
+db_request_seconds = registry.histogram(
+    "db_request_duration_seconds", "Time spent in SQL statements per request", ("route",)
+)
+db_query_seconds = registry.histogram("db_query_duration_seconds", "SQL statement latency")
+host_rule_seconds = registry.histogram(
+    "host_rule_duration_seconds",
+    "Host rule evaluation time by rule and candidate pool size",
+    ("rule", "pool"),
+)
@@ -0,0 +1,78 @@
+# Random sampling over dense ordinals.
+# Words of one length are numbered 0..n-1 (`vocabularies.ordinal`, word table ids), so drawing
+# random words is drawing random integers, in O(k) time without touching the other words.
+# Weighted draws (`vocabularies.weight`) go through a precomputed alias table, O(1) per word.
+import random
+from collections.abc import Sequence
+
+import numpy as np
+
+
+def sample_distinct(n: int, k: int, rng: random.Random | None = None) -> list[int]:
+    """`min(k, n)` distinct integers from `range(n)` in random order (Floyd's algorithm)."""
+    rng = rng or random
+    k = min(k, n)
+    picked: set[int] = set()
+    for j in range(n - k, n):
+        i = rng.randrange(j + 1)
+        picked.add(j if i in picked else i)
+    sample = list(picked)
+    rng.shuffle(sample)
+    return sample
+
+
+class AliasTable:
+    """Walker alias table: draws index `i` with probability `weights[i] / sum(weights)` in O(1).
+
+    Built once in O(n) (Vose's method); rebuild it when the weights change.
+    """
+
+    def __init__(self, weights: Sequence[float]):
+        w = np.asarray(weights, dtype=np.float64)
+        if w.ndim != 1 or (w < 0).any() or not np.isfinite(w).all() or w.sum() <= 0:
+            raise ValueError("Weights must be finite, non-negative and not all zero")
+        n = len(w)
+        scaled = w * n / w.sum()
+        self.prob = np.ones(n, dtype=np.float64)
+        self.alias = np.arange(n, dtype=np.int64)
+        self.nonzero = np.flatnonzero(w > 0)
+        self.support = len(self.nonzero)
+        small = [i for i in range(n) if scaled[i] < 1.0]
+        large = [i for i in range(n) if scaled[i] >= 1.0]
+        while small and large:
+            s, g = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = g
+            scaled[g] -= 1.0 - scaled[s]
+            (small if scaled[g] < 1.0 else large).append(g)
+        # leftovers are 1 up to rounding, unless the word has no weight at all
+        for i in small + large:
+            self.prob[i] = 1.0 if w[i] > 0 else 0.0
+            self.alias[i] = i if w[i] > 0 else self.nonzero[0]
+
+    def __len__(self) -> int:
+        return len(self.prob)
+
+    def draw(self, rng: random.Random | None = None) -> int:
+        rng = rng or random
+        i = rng.randrange(len(self.prob))
+        return i if rng.random() < self.prob[i] else int(self.alias[i])
+
+    def sample_distinct(self, k: int, rng: random.Random | None = None) -> list[int]:
+        """`min(k, support)` distinct weighted draws, by rejecting repeats.
+
+        When a few heavy words keep repeating, the rest is filled uniformly from the words with a
+        non-zero weight, so the cost stays bounded.
+        """
+        rng = rng or random
+        k = min(k, self.support)
+        picked: dict[int, None] = {}
+        for _ in range(4 * k + 16):
+            if len(picked) == k:
+                break
+            picked.setdefault(self.draw(rng))
+        if len(picked) < k:
+            rest = [i for i in self.nonzero.tolist() if i not in picked]
+            rng.shuffle(rest)
+            picked.update(dict.fromkeys(rest[: k - len(picked)]))
+        return list(picked)
@@ -0,0 +1,53 @@
+# Splits large candidate arrays into shards evaluated in parallel threads.
+# The id filters and hint comparisons are numpy element-wise work that releases the GIL, so a
+# full-dictionary pool can use every core. Arrays below `SHARD_MIN_SIZE` stay on the calling
+# thread, where the hand-off would cost more than the work.
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from config import SHARD_MIN_SIZE, SHARD_WORKERS
+
+_pool: ThreadPoolExecutor | None = None
+_pool_pid: int | None = None
+_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ThreadPoolExecutor:
+    # Threads do not survive a fork, so forked host workers start their own pool
+    global _pool, _pool_pid
+    with _lock:
+        if _pool is None or _pool_pid != os.getpid() or _pool._max_workers < workers:
+            _pool = ThreadPoolExecutor(workers, thread_name_prefix="shard")
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def shard_map(
+    fn: Callable[[np.ndarray], object],
+    array: np.ndarray,
+    workers: int = SHARD_WORKERS,
+    min_size: int = SHARD_MIN_SIZE,
+) -> list:
+    """`fn` of consecutive shards of `array` along the first axis, results in shard order."""
+    shards = min(workers, len(array) // max(min_size, 1))
+    if shards <= 1:
+        return [fn(array)]
+    return list(_get_pool(workers).map(fn, np.array_split(array, shards)))
+
+
+def shard_concat(
+    fn: Callable[[np.ndarray], np.ndarray | tuple[np.ndarray, ...]],
+    array: np.ndarray,
+    workers: int = SHARD_WORKERS,
+    min_size: int = SHARD_MIN_SIZE,
+) -> np.ndarray | tuple[np.ndarray, ...]:
+    """`shard_map` whose per-shard arrays (or tuples of arrays) are concatenated back."""
+    results = shard_map(fn, array, workers, min_size)
+    if len(results) == 1:
+        return results[0]
+    if isinstance(results[0], tuple):
+        return tuple(np.concatenate(parts) for parts in zip(*results))
+    return np.concatenate(results)
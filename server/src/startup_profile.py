@@ -0,0 +1,111 @@
+# Cold-start profile of the server: per-module import times and the duration of each startup
+# phase (migrations, engine, cache warm up).
+# Usage (from server/): PYTHONPATH=. python src/startup_profile.py [--top 20] [--out report.json]
+# Imports are measured with `python -X importtime` in a fresh interpreter, so the figures are
+# those of a newly spawned worker. Lifespan phases are recorded by the running server in
+# `startup_phases` and reported on /stats/startup.
+import argparse
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import NamedTuple
+
+SERVER_DIR = Path(__file__).resolve().parent.parent
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(stderr: str) -> list[ImportTime]:
+    """Rows of `-X importtime` output, in import order."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = [f.strip() for f in line[len("import time:") :].split("|")]
+        if len(fields) != 3 or not fields[0].isdigit():
+            # header line
+            continue
+        rows.append(ImportTime(fields[2], int(fields[0]), int(fields[1])))
+    return rows
+
+
+def import_times(module: str = "server", cwd: str | Path | None = None) -> list[ImportTime]:
+    """Import `module` in a fresh interpreter and return the time spent on each import."""
+    env = {**os.environ, "PYTHONPATH": str(SERVER_DIR)}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def total_us(rows: list[ImportTime]) -> int:
+    return sum(row.self_us for row in rows)
+
+
+class PhaseTimer:
+    """Wall time of named startup phases, in the order they ran."""
+
+    def __init__(self):
+        self.seconds: dict[str, float] = {}
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = time.perf_counter() - start
+
+    def report(self) -> dict[str, float]:
+        return dict(self.seconds)
+
+
+startup_phases = PhaseTimer()
+
+
+def report(module: str, top: int) -> dict:
+    rows = import_times(module)
+    slowest = sorted(rows, key=lambda row: row.self_us, reverse=True)[:top]
+    return {
+        "module": module,
+        "modules": len(rows),
+        "import_ms": total_us(rows) / 1000,
+        "slowest": [
+            {
+                "module": r.module,
+                "self_ms": r.self_us / 1000,
+                "cumulative_ms": r.cumulative_us / 1000,
+            }
+            for r in slowest
+        ],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile the import time of the server")
+    parser.add_argument("--module", default="server")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--out", help="write the report as JSON to this file")
+    args = parser.parse_args()
+
+    result = report(args.module, args.top)
+    if args.out:
+        Path(args.out).write_text(json.dumps(result, indent=2))
+    print(f"import {result['module']}: {result['import_ms']:.1f} ms, {result['modules']} modules")
+    print(f"{'module':<50}{'self ms':>10}{'cum ms':>10}")
+    for row in result["slowest"]:
+        print(f"{row['module']:<50}{row['self_ms']:>10.1f}{row['cumulative_ms']:>10.1f}")
@@ -0,0 +1,60 @@
+import itertools
+
+import numpy as np
+import pytest
+from candidate_codec import (
+    BITSET,
+    IDS16,
+    IDS32,
+    TEXT,
+    pack_ids,
+    pack_words,
+    unpack_ids,
+    unpack_words,
+)
+from word_mask import WordTable
+
+WORDS = ["buggy", "crazy", "fancy", "fresh", "hello", "panic", "quite", "scare", "world"]
+
+
+@pytest.fixture
+def table() -> WordTable:
+    return WordTable(5, WORDS)
+
+
+def test_pack_sparse_ids():
+    words = ["".join(letters) for letters in itertools.product("abcde", repeat=3)]
+    table = WordTable(3, words)
+    packed = pack_words(table, ["eee", "aad"])
+    assert packed[0] == IDS16
+    assert len(packed) == 1 + 2 * 2
+
+    ids = unpack_ids(table, packed)
+    assert ids.tolist() == [3, 124]
+    assert not ids.flags.owndata
+    assert unpack_words(table, packed) == ["aad", "eee"]
+
+
+def test_pack_dense_ids(table):
+    packed = pack_words(table, WORDS)
+    assert packed[0] == BITSET
+    assert len(packed) == 1 + 2
+    assert unpack_words(table, packed) == WORDS
+
+
+def test_pack_large_ids():
+    table = WordTable(1, [chr(ord("a") + i % 26) for i in range(26)])
+    table.num_vocab = 1 << 20
+    packed = pack_ids(table, np.array([3, 70000]))
+    assert packed[0] == IDS32
+    assert unpack_ids(table, packed).tolist() == [3, 70000]
+
+
+def test_pack_words_outside_vocabulary(table):
+    packed = pack_words(table, ["hello", "zzzzz"])
+    assert packed[0] == TEXT
+    assert unpack_words(table, packed) == ["hello", "zzzzz"]
+
+
+def test_pack_empty(table):
+    assert unpack_words(table, pack_words(table, [])) == []
@@ -0,0 +1,64 @@
+import itertools
+import random
+import time
+
+import numpy as np
+from src.constraint_index import PositionalIndex
+from src.vocab_index import VocabularyIndex
+
+WORDS = ["hello", "world", "quite", "fancy", "fresh", "panic", "crazy", "buggy", "scare"]
+
+
+def matches(word: str, maps: dict[str, str]) -> bool:
+    # the SQL predicates of Vocabulary.get_random_word_by_length
+    for guess, hint in maps.items():
+        for idx, (char, symbol) in enumerate(zip(guess, hint)):
+            at = word[idx] if idx < len(word) else ""
+            if symbol == "0" and at != char:
+                return False
+            if symbol == "?" and (char not in word or at == char):
+                return False
+            if symbol == "_" and char in word:
+                return False
+    return True
+
+
+def test_match():
+    index = PositionalIndex(WORDS, 5)
+    assert index.ids({}).tolist() == list(range(len(WORDS)))
+    # "c" and "a" present but elsewhere, no "r", "z" or "y"
+    maps = {"crazy": "?_?__"}
+    expected = [i for i, w in enumerate(WORDS) if matches(w, maps)]
+    assert index.ids(maps).tolist() == expected == [WORDS.index("panic")]
+    assert index.count({"crazy": "?____"}) == 0
+    assert index.count({"fresh": "00___"}) == 0
+
+
+def test_match_against_reference():
+    rng = random.Random(0)
+    words = ["".join(p) for p in itertools.product("abcdef", repeat=4)]
+    index = PositionalIndex(words, 4)
+    for _ in range(50):
+        maps = {
+            "".join(rng.choice("abcdefg") for _ in range(4)): "".join(
+                rng.choice("0?_") for _ in range(4)
+            )
+            for _ in range(rng.randint(1, 3))
+        }
+        expected = [i for i, w in enumerate(words) if matches(w, maps)]
+        assert index.ids(maps).tolist() == expected
+
+
+def test_vocabulary_search_is_fast():
+    words = ["".join(p) for p in itertools.product("abcdefghijklmnopqrstuvwxyz", repeat=3)][:15000]
+    index = VocabularyIndex({3: words})
+    maps = {"abc": "?__", "dea": "_0?"}
+    index.matching_ordinals(3, maps)
+
+    start = time.perf_counter()
+    ordinals = index.matching_ordinals(3, maps)
+    assert time.perf_counter() - start < 0.01
+    assert all(matches(words[i], maps) for i in ordinals)
+    found = index.random_matching_words(3, maps, 5)
+    assert len(found) == min(5, len(ordinals)) and all(matches(w, maps) for w in found)
+    assert isinstance(ordinals, np.ndarray)
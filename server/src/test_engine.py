@@ -0,0 +1,100 @@
+import random
+from pathlib import Path
+
+import numpy as np
+import pytest
+from engine import (
+    compare_batch,
+    decode_hints,
+    encode_words,
+    pattern_codes,
+    unpack_pattern,
+)
+from feedback_matrix import compare_ids
+from game_guess import (
+    compare_two_words,
+    filter_candidates,
+    get_highest_words,
+    get_lowest_words,
+    update_candidate_by_host_cheating_rule,
+    update_candidate_by_host_cheating_rule_reference,
+)
+from word_mask import WordTable, refine_by_highest_ids
+
+WORDS_FILE = Path(__file__).resolve().parent.parent / "alembic" / "vocab" / "words.txt"
+DEFAULT_WORDS = ["hello", "world", "quite", "fancy", "fresh", "panic", "crazy", "buggy", "scare"]
+
+
+@pytest.fixture(scope="module")
+def vocab() -> list[str]:
+    return [w.strip() for w in WORDS_FILE.read_text().splitlines() if w.strip()]
+
+
+class MockHistoryRecord:
+    def __init__(self, word: str, hint: str):
+        self.word = word
+        self.hint = hint
+
+
+def test_compare_batch_matches_reference(vocab):
+    rng = random.Random(1)
+    candidates = rng.sample(vocab, 2000)
+    for guess in rng.sample(vocab, 20) + DEFAULT_WORDS:
+        codes, scores = compare_batch(guess, encode_words(candidates))
+        expected = [compare_two_words(guess, c) for c in candidates]
+        assert decode_hints(codes) == [h for h, _ in expected]
+        assert scores.tolist() == [s for _, s in expected]
+
+
+def test_pattern_codes_roundtrip(vocab):
+    codes, _ = compare_batch("crane", encode_words(vocab[:500]))
+    packed = pattern_codes(codes)
+    assert packed.dtype == np.uint8
+    for row, code in zip(codes, packed):
+        assert unpack_pattern(code, 5).tolist() == row.tolist()
+
+
+def test_refine_by_highest_matches_reference(vocab):
+    rng = random.Random(3)
+    for _ in range(20):
+        candidates = rng.sample(vocab, 300)
+        guess = rng.choice(vocab)
+        table = WordTable(5, candidates)
+        ids = table.ids(candidates)
+        codes, scores = compare_ids(guess, table, ids)
+        keep = refine_by_highest_ids(guess, codes, scores, table, ids)
+
+        highest, hints = get_highest_words(guess, candidates)
+        update = set(candidates)
+        for word, hint in zip(highest, hints):
+            update &= set(filter_candidates(word, hint, update))
+        assert {c for c, k in zip(candidates, keep) if k} == update
+
+        lowest, _ = get_lowest_words(guess, candidates)
+        assert {c for c, s in zip(candidates, scores) if s == scores.min()} == set(lowest)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_host_rule_matches_reference(vocab, seed):
+    rng = random.Random(seed)
+    candidates = rng.sample(vocab, 200) if seed % 2 else list(DEFAULT_WORDS)
+    history = []
+    for _ in range(4):
+        guess = rng.choice(vocab)
+        try:
+            expected_hint, expected = update_candidate_by_host_cheating_rule_reference(
+                history, guess, candidates
+            )
+        except IndexError:
+            # the reference cannot pick from an empty lowest list
+            break
+        hint, update = update_candidate_by_host_cheating_rule(history, guess, candidates)
+        if set(update) == set(expected):
+            assert hint == expected_hint
+        else:
+            # both took the random pick from the lowest scoring words
+            lowest, _ = get_lowest_words(guess, candidates)
+            assert len(expected) == len(update) == 1
+            assert update[0] in lowest
+        history.append(MockHistoryRecord(guess, hint))
+        candidates = update
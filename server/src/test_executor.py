@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+from src import word_mask
+from src.executor import HostExecutor, run_host_rule
+from src.word_mask import WordTable, get_word_table
+
+WORDS = ["hello", "world", "quite", "fancy", "fresh", "panic", "crazy", "buggy", "scare"]
+
+
+def run(executor, *args):
+    return asyncio.run(executor.run(*args))
+
+
+@pytest.fixture
+def ids(monkeypatch):
+    # vocabulary ids, so "process" pools evaluate them in the worker processes
+    monkeypatch.setattr(word_mask, "_tables", {5: WordTable(5, WORDS)})
+    return get_word_table(5).ids(WORDS)
+
+
+def test_small_pool_runs_inline(ids):
+    executor = HostExecutor("thread", max_workers=1, inline_below=100)
+    executor.start()
+    try:
+        hint, remaining = run(executor, "cheating", [], "buggy", 5, ids)
+    finally:
+        executor.shutdown()
+    assert hint == "_____"
+    assert executor.stats()["inline"] == 1
+    assert executor.stats()["submitted"] == 0
+
+
+@pytest.mark.parametrize(
+    "kind, start_method",
+    [("thread", "forkserver"), ("process", "forkserver"), ("process", "spawn")],
+)
+def test_large_pool_runs_in_pool(ids, kind, start_method):
+    executor = HostExecutor(kind, max_workers=1, inline_below=0, start_method=start_method)
+    executor.start()
+    try:
+        hint, remaining = run(executor, "cheating", [], "buggy", 5, ids)
+    finally:
+        executor.shutdown()
+    assert hint == "_____"
+    table = get_word_table(5)
+    assert set(table.lookup(remaining)) == {"hello", "world", "fresh", "panic", "scare"}
+    stats = executor.stats()
+    assert (stats["submitted"], stats["completed"], stats["in_flight"]) == (1, 1, 0)
+
+
+def test_timeout(ids, monkeypatch):
+    def slow_rule(*args):
+        time.sleep(0.2)
+        return ("_____", args[3]), 0.2
+
+    monkeypatch.setattr("src.executor.run_host_rule", slow_rule)
+    executor = HostExecutor("thread", max_workers=1, timeout=0.01, inline_below=0)
+    executor.start()
+    try:
+        with pytest.raises(TimeoutError):
+            run(executor, "cheating", [], "buggy", 5, ids)
+    finally:
+        executor.shutdown()
+    assert executor.stats()["timeouts"] == 1
+
+
+def test_restart_keeps_running_rules(ids, monkeypatch):
+    def slow_rule(*args):
+        time.sleep(0.1)
+        return ("_____", args[3]), 0.1
+
+    monkeypatch.setattr("src.executor.run_host_rule", slow_rule)
+    executor = HostExecutor("thread", max_workers=1, inline_below=0)
+    executor.start()
+
+    async def run_and_restart():
+        running = [asyncio.create_task(executor.run("cheating", [], "buggy", 5, ids)) for _ in "ab"]
+        await asyncio.sleep(0.01)
+        old = executor._pool
+        executor.restart()
+        assert executor._pool is not old
+        return await asyncio.gather(*running)
+
+    try:
+        results = asyncio.run(run_and_restart())
+    finally:
+        executor.shutdown()
+    assert [hint for hint, _ in results] == ["_____", "_____"]
+    assert executor.stats()["completed"] == 2
+
+
+def test_rejects_fork():
+    with pytest.raises(ValueError):
+        HostExecutor("process", start_method="fork")
+
+
+def test_run_host_rule_reports_time(ids):
+    (hint, remaining), seconds = run_host_rule("bucket", [], "buggy", 5, np.asarray(ids), True)
+    assert hint == "_____"
+    assert seconds >= 0
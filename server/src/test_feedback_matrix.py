@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from engine import compare_batch, encode_words
+from feedback_matrix import (
+    build_feedback_matrices,
+    compare_ids,
+    get_feedback_matrix,
+    load_feedback_matrices,
+    matrix_nbytes,
+)
+from src import word_mask
+from src.word_mask import get_word_table
+
+WORDS = ["hello", "world", "quite", "fancy", "fresh", "panic", "crazy", "buggy", "scare"]
+
+
+@pytest.fixture
+def matrices(tmp_path, monkeypatch):
+    # fresh word tables, so the matrix words are their first ids
+    monkeypatch.setattr(word_mask, "_tables", {})
+    built = build_feedback_matrices(WORDS + ["apple", "grape", "banana"], tmp_path)
+    yield tmp_path, built
+    load_feedback_matrices(tmp_path / "missing")
+
+
+def test_build_and_lookup(matrices):
+    directory, built = matrices
+    assert built == [5, 6]
+    load_feedback_matrices(directory)
+
+    matrix = get_feedback_matrix(5)
+    assert isinstance(matrix.matrix, np.memmap)
+    assert matrix.matrix.shape == (11, 11)
+    table = get_word_table(5)
+    assert matrix.table is table
+    ids = table.ids(WORDS)
+    for guess in WORDS:
+        codes, scores = compare_ids(guess, table, ids)
+        expected_codes, expected_scores = compare_batch(guess, encode_words(WORDS))
+        assert codes.tolist() == expected_codes.tolist()
+        assert scores.tolist() == expected_scores.tolist()
+
+
+def test_fallback_for_unknown_word(matrices):
+    directory, _ = matrices
+    load_feedback_matrices(directory)
+
+    # "zzzzz" gets a process-local id past the end of the matrix
+    table = get_word_table(5)
+    ids = table.ids(["hello", "zzzzz"])
+    assert ids.max() >= len(get_feedback_matrix(5).words)
+    codes, scores = compare_ids("hello", table, ids)
+    assert scores.tolist() == [50, 0]
+
+
+def test_skip_oversized_length(tmp_path):
+    limit = matrix_nbytes(len(WORDS), 5)
+    assert build_feedback_matrices(WORDS + ["apple"], tmp_path, max_bytes=limit) == []
+    assert build_feedback_matrices(WORDS, tmp_path, max_bytes=limit) == [5]
@@ -1,4 +1,7 @@
+import random
+
 from game_guess import (
+    HOST_RULES,
     Hint,
     compare_two_words,
     filter_by_history,
@@ -6,6 +9,7 @@ from game_guess import (
     get_highest_words,
     get_lowest_words,
     update_candidate_by_host_cheating_rule,
+    update_candidate_by_pattern_bucket,
 )
 
 
@@ -258,3 +262,95 @@ def test_guess_in_history7():
     assert (
         remaining_candidates[0] in expected_candidates
     ), f"Expected {expected_candidates}, but got {remaining_candidates}"
+
+
+def _buckets(guess, candidates):
+    buckets = {}
+    for candidate in candidates:
+        hint, score = compare_two_words(guess, candidate)
+        buckets.setdefault((hint, score), []).append(candidate)
+    return buckets
+
+
+def test_pattern_bucket_largest():
+    guess = "buggy"
+    candidates = ["hello", "world", "quite", "fancy", "fresh", "panic", "crazy", "buggy", "scare"]
+    expected_hint = Hint.MISS.value * 5
+    expected_candidates = ["hello", "world", "fresh", "panic", "scare"]
+
+    hint, remaining_candidates = update_candidate_by_pattern_bucket([], guess, candidates)
+    assert hint == expected_hint, f"Expected {expected_hint}, but got {hint}"
+    assert (
+        remaining_candidates == expected_candidates
+    ), f"Expected {expected_candidates}, but got {remaining_candidates}"
+
+
+def test_pattern_bucket_policies():
+    guess = "scare"
+    candidates = ["hello", "world", "quite", "fancy", "fresh", "panic", "crazy", "buggy", "scare"]
+    buckets = _buckets(guess, candidates)
+
+    hint, remaining = update_candidate_by_pattern_bucket(
+        [], guess, candidates, policy="lowest_score"
+    )
+    lowest = min(buckets, key=lambda k: (k[1], -len(buckets[k])))
+    assert (hint, remaining) == (lowest[0], buckets[lowest])
+
+    largest = max(len(b) for b in buckets.values())
+    hint, remaining = update_candidate_by_pattern_bucket([], guess, candidates, policy="random")
+    assert len(remaining) == largest
+    assert all(compare_two_words(guess, c)[0] == hint for c in remaining)
+
+
+def test_pattern_bucket_guess_in_history():
+    history = [MockHistoryRecord(word="hello", hint=Hint.MISS.value * 5)]
+    candidates = ["fancy", "panic"]
+
+    hint, remaining_candidates = update_candidate_by_pattern_bucket(history, "hello", candidates)
+    assert hint == Hint.MISS.value * 5
+    assert remaining_candidates == candidates
+
+
+def test_host_rules():
+    assert HOST_RULES["cheating"] is update_candidate_by_host_cheating_rule
+    assert HOST_RULES["bucket"] is update_candidate_by_pattern_bucket
+
+
+def test_incremental_matches_replay():
+    rng = random.Random(5)
+    words = ["hello", "world", "quite", "fancy", "fresh", "panic", "crazy", "buggy", "scare"]
+    for rule in HOST_RULES.values():
+        for _ in range(10):
+            history = []
+            candidates = list(words)
+            # with repeats, whose hint comes from the history instead of a host decision
+            for guess in rng.choices(words, k=6):
+                if not candidates:
+                    break
+                random.seed(guess)
+                replayed = rule(history, guess, candidates, replay=True)
+                random.seed(guess)
+                incremental = rule(history, guess, candidates, replay=False)
+                assert incremental == replayed
+                hint, candidates = incremental
+                history.append(MockHistoryRecord(word=guess, hint=hint))
+                if hint == Hint.HIT.value * len(guess):
+                    # the game is over
+                    break
+
+
+def test_incremental_repeated_guess():
+    # the hint of "quite" is still pending when "hello" is repeated, and must not be lost
+    words = ["hello", "world", "quite", "fancy", "fresh", "panic", "crazy", "buggy", "scare"]
+    history = []
+    candidates = list(words)
+    for guess in ["hello", "quite", "hello", "world"]:
+        random.seed(guess)
+        replayed = update_candidate_by_host_cheating_rule(history, guess, candidates, replay=True)
+        random.seed(guess)
+        hint, candidates = update_candidate_by_host_cheating_rule(
+            history, guess, candidates, replay=False
+        )
+        assert (hint, candidates) == replayed
+        history.append(MockHistoryRecord(word=guess, hint=hint))
+    assert "panic" not in candidates
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from src.feedback_matrix import compare_ids
+from src.hint_cache import BoundedCache, row_cache
+from src.word_mask import WordTable
+
+
+def test_lru_eviction():
+    cache = BoundedCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (3, 1, 1)
+    assert stats["hit_rate"] == 0.75
+
+
+def test_fifo_eviction():
+    cache = BoundedCache(2, eviction="fifo")
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+
+def test_byte_bound():
+    cache = BoundedCache(10, max_bytes=250)
+    for i in range(5):
+        cache.put(i, np.zeros(100, dtype=np.uint8))
+    assert len(cache) == 2
+    assert cache.bytes == 200
+    assert cache.evictions == 3
+
+    cache.put("big", np.zeros(300, dtype=np.uint8))
+    assert cache.get("big") is None
+    with pytest.raises(ValueError):
+        BoundedCache(1, eviction="random")
+
+
+def test_row_cache_serves_compare_ids():
+    table = WordTable(5, ["hello", "world", "quite", "fancy"])
+    ids = np.array([1, 3])
+    row_cache.clear()
+    first = compare_ids("crazy", table, ids)
+    second = compare_ids("crazy", table, ids)
+    assert row_cache.hits == 1
+    assert [a.tolist() for a in first] == [b.tolist() for b in second]
+
+    # rows are recomputed for words added to the table after the row was cached
+    new = table.ids(["panic"])
+    _, scores = compare_ids("crazy", table, new)
+    assert scores.tolist() == [2]
+
+
+def test_ttl_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("src.hint_cache.time.monotonic", lambda: now[0])
+    cache = BoundedCache(10, ttl=5)
+    cache.put("a", 1)
+    now[0] += 4
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1 and cache.bytes == 0
+
+
+def test_delete():
+    cache = BoundedCache(10)
+    cache.put("a", 1)
+    cache.delete("a")
+    cache.delete("missing")
+    assert cache.get("a") is None and cache.bytes == 0
@@ -0,0 +1,54 @@
+import pytest
+from src.metrics import Registry, pool_bucket
+
+
+def test_pool_bucket():
+    assert pool_bucket(0) == "<10"
+    assert pool_bucket(14_855) == "<100000"
+    assert pool_bucket(100_000) == ">=100000"
+
+
+def test_render_counter_and_histogram():
+    registry = Registry(None)
+    requests = registry.counter("requests_total", "Requests", ("route", "status"))
+    latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    requests.inc("/v1/{id}", "200")
+    requests.inc("/v1/{id}", "200")
+    latency.observe(0.1, "/v1/{id}")
+    latency.observe(0.5, "/v1/{id}")
+    latency.observe(3, "/v1/{id}")
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{route="/v1/{id}",status="200"} 2' in text
+    assert 'latency_seconds_bucket{route="/v1/{id}",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/v1/{id}",le="1"} 2' in text
+    assert 'latency_seconds_bucket{route="/v1/{id}",le="+Inf"} 3' in text
+    assert 'latency_seconds_sum{route="/v1/{id}"} 3.6' in text
+    assert 'latency_seconds_count{route="/v1/{id}"} 3' in text
+
+
+def test_duplicate_metric():
+    registry = Registry(None)
+    registry.counter("requests_total", "Requests")
+    with pytest.raises(ValueError):
+        registry.counter("requests_total", "Requests")
+
+
+def test_collect_sums_workers(tmp_path):
+    worker = Registry(tmp_path)
+    worker.counter("requests_total", "Requests", ("status",)).inc("200", amount=3)
+    worker.histogram("latency_seconds", "Latency", buckets=(1.0,)).observe(0.5)
+    # another process' snapshot
+    (tmp_path / "metrics_1.json").write_text(
+        '{"requests_total": [[["200"], 2], [["500"], 1]], "latency_seconds": [[[], [1, 1, 2.5]]]}'
+    )
+
+    totals = worker.collect()
+    assert totals["requests_total"] == {("200",): 5, ("500",): 1}
+    assert totals["latency_seconds"] == {(): [2, 1, 3.0]}
+
+    worker.write_snapshot()
+    assert len(list(tmp_path.glob("metrics_*.json"))) == 2
+    # its own snapshot is not counted twice
+    assert worker.collect()["requests_total"][("200",)] == 5
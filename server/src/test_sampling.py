@@ -0,0 +1,45 @@
+import random
+from collections import Counter
+
+import pytest
+from src.sampling import AliasTable, sample_distinct
+
+
+def test_sample_distinct():
+    sample = sample_distinct(100, 10)
+    assert len(sample) == len(set(sample)) == 10
+    assert all(0 <= i < 100 for i in sample)
+
+
+def test_sample_more_than_population():
+    assert sorted(sample_distinct(5, 10)) == [0, 1, 2, 3, 4]
+    assert sample_distinct(0, 3) == []
+
+
+def test_sample_is_uniform():
+    rng = random.Random(0)
+    counts = Counter(i for _ in range(20000) for i in sample_distinct(10, 2, rng))
+    assert all(abs(c - 4000) < 300 for c in counts.values())
+
+
+def test_alias_table_follows_weights():
+    rng = random.Random(1)
+    table = AliasTable([1, 0, 3, 6])
+    counts = Counter(table.draw(rng) for _ in range(20000))
+    assert counts[1] == 0
+    for i, p in [(0, 0.1), (2, 0.3), (3, 0.6)]:
+        assert abs(counts[i] / 20000 - p) < 0.02
+
+
+def test_alias_sample_distinct():
+    table = AliasTable([1000, 1, 1, 1, 0])
+    sample = table.sample_distinct(10, random.Random(2))
+    # the zero weight word is never picked, even when filling up after repeated heavy draws
+    assert sorted(sample) == [0, 1, 2, 3]
+    assert len(set(table.sample_distinct(2))) == 2
+
+
+def test_alias_table_rejects_bad_weights():
+    for weights in ([], [0, 0], [1, -1], [float("nan")]):
+        with pytest.raises(ValueError):
+            AliasTable(weights)
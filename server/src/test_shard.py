@@ -0,0 +1,40 @@
+import itertools
+
+import numpy as np
+from src.feedback_matrix import compare_ids
+from src.shard import shard_concat, shard_map
+from src.word_mask import WordTable, filter_by_history_ids
+
+
+def test_small_arrays_stay_in_one_shard():
+    assert len(shard_map(len, np.arange(100), workers=4, min_size=64)) == 1
+
+
+def test_shards_keep_order():
+    values = np.arange(1000)
+    assert len(shard_map(len, values, workers=4, min_size=100)) == 4
+    assert np.array_equal(
+        shard_concat(lambda a: a * 2, values, workers=4, min_size=100), values * 2
+    )
+
+
+def test_shard_concat_tuples():
+    values = np.arange(10)
+    a, b = shard_concat(lambda x: (x, -x), values, workers=3, min_size=2)
+    assert np.array_equal(a, values) and np.array_equal(b, -values)
+
+
+def test_sharded_filter_matches_single_shard():
+    table = WordTable(3, ["".join(p) for p in itertools.product("abcdefghij", repeat=3)])
+    ids = np.arange(len(table))
+    expected = filter_by_history_ids(table, "abc", "_?0", ids)
+    codes, scores = compare_ids("cab", table, ids)
+
+    sharded = shard_concat(
+        lambda a: filter_by_history_ids(table, "abc", "_?0", a), ids, workers=4, min_size=64
+    )
+    assert np.array_equal(sharded, expected)
+    sharded_codes, sharded_scores = shard_concat(
+        lambda a: compare_ids("cab", table, a), ids, workers=4, min_size=64
+    )
+    assert np.array_equal(sharded_codes, codes) and np.array_equal(sharded_scores, scores)
@@ -0,0 +1,42 @@
+import pytest
+from config import STARTUP_IMPORT_BUDGET_MS
+from src.startup_profile import ImportTime, PhaseTimer, import_times, parse_importtime, total_us
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:        92 |         92 |   _io
+import time:       310 |        402 | json
+not an import line
+"""
+
+
+def test_parse_importtime():
+    rows = parse_importtime(SAMPLE)
+    assert rows == [ImportTime("_io", 92, 92), ImportTime("json", 310, 402)]
+    assert total_us(rows) == 402
+
+
+def test_phase_timer():
+    timer = PhaseTimer()
+    with timer.phase("engine"):
+        pass
+    with pytest.raises(RuntimeError):
+        with timer.phase("migrations"):
+            raise RuntimeError
+    assert list(timer.report()) == ["engine", "migrations"]
+
+
+@pytest.fixture(scope="module")
+def server_imports(tmp_path_factory):
+    # the server creates its logs folder in the working directory
+    return import_times("server", cwd=tmp_path_factory.mktemp("startup"))
+
+
+def test_server_import_budget(server_imports):
+    assert total_us(server_imports) / 1000 < STARTUP_IMPORT_BUDGET_MS
+
+
+def test_server_import_is_lazy(server_imports):
+    modules = {row.module.strip() for row in server_imports}
+    assert "models.migration" in modules
+    assert "alembic" not in modules
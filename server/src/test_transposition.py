@@ -0,0 +1,49 @@
+import numpy as np
+from src.game_guess import cheating_decision, host_cheating_rule_ids, pattern_bucket_ids
+from src.transposition import Decision, fingerprint, transposition_table
+from src.word_mask import WordTable
+
+WORDS = ["hello", "world", "quite", "fancy", "fresh", "panic", "crazy", "buggy", "scare"]
+
+
+def test_fingerprint_ignores_order():
+    assert fingerprint(np.array([3, 1, 2])) == fingerprint(np.array([1, 2, 3], dtype=np.uint16))
+    assert fingerprint(np.array([1, 2])) != fingerprint(np.array([1, 2, 3]))
+
+
+def test_repeated_decision_is_memoized():
+    table = WordTable(5, WORDS)
+    ids = table.ids(WORDS)
+    transposition_table.clear()
+
+    first = host_cheating_rule_ids([], "buggy", table, ids)
+    second = host_cheating_rule_ids([], "buggy", table, ids[::-1].copy())
+    assert transposition_table.stats()["hits"] == 1
+    assert first[0] == second[0]
+    assert set(table.lookup(first[1])) == {"hello", "world", "fresh", "panic", "scare"}
+
+
+def test_random_decision_keeps_alternatives():
+    table = WordTable(5, WORDS)
+    ids = table.ids(["hello", "world"])
+
+    # both words score the same, so the host picks one of them at random
+    decision = cheating_decision([], "scare", table, ids)
+    assert len(decision.outcomes) == 2
+    transposition_table.clear()
+    picks = {tuple(host_cheating_rule_ids([], "scare", table, ids)[1]) for _ in range(50)}
+    assert picks == {(ids[0],), (ids[1],)}
+    assert len(transposition_table) == 1
+
+
+def test_random_buckets_keep_alternatives():
+    table = WordTable(5, WORDS)
+    ids = table.ids(["hello", "world"])
+    transposition_table.clear()
+    hints = {pattern_bucket_ids([], "scare", table, ids, policy="random")[0] for _ in range(50)}
+    assert hints == {"____?", "___?_"}
+
+
+def test_decision_size():
+    decision = Decision((("_____", np.arange(100, dtype=np.int64)),))
+    assert decision.nbytes() > 800
@@ -0,0 +1,47 @@
+import pytest
+from src.vocab_import import WordStream, check_no_servers, parse_weights
+
+
+def test_parse_weights():
+    lines = ["Hello 10\n", "world,2.5\n", "\n", "hello 3\n"]
+    assert parse_weights(lines) == {"hello": 3.0, "world": 2.5}
+
+
+@pytest.mark.parametrize("line", ["hello", "hello 1 2", "hello -1", "hello x"])
+def test_parse_weights_rejects_bad_lines(line):
+    with pytest.raises(ValueError):
+        parse_weights([line])
+
+
+def test_word_stream_normalizes_lines():
+    stream = WordStream(["Hello\n", "\n", "  world \n", "don't\n", "café\n", "fancy"])
+    assert stream.read() == b"hello\nworld\nfancy\n"
+    assert (stream.words, stream.skipped) == (3, 2)
+
+
+def test_word_stream_reads_in_chunks():
+    words = [f"{a}{b}\n" for a in "abcdefghij" for b in "abcdefghij"]
+    stream = WordStream(words)
+    chunks = iter(lambda: stream.read(7), b"")
+    assert b"".join(chunks).decode().split() == [w.strip() for w in words]
+
+
+class FakeConnection:
+    def __init__(self, servers):
+        self.servers = servers
+        self.params = []
+
+    def execute(self, statement, params):
+        self.params.append(params)
+        return self
+
+    def scalar_one(self):
+        return self.servers
+
+
+def test_prune_refuses_while_servers_are_connected():
+    check_no_servers(FakeConnection(0))
+    conn = FakeConnection(3)
+    with pytest.raises(RuntimeError, match="stop the servers"):
+        check_no_servers(conn)
+    assert conn.params == [{"name": "wordle-server"}]
@@ -0,0 +1,42 @@
+from src.vocab_index import VocabularyIndex, get_vocab_index, load_vocabulary
+from src.word_mask import get_word_table
+
+WORDS = {5: ["hello", "world", "quite", "fancy"], 3: ["cat", "dog"], 4: []}
+
+
+def test_lookup():
+    index = VocabularyIndex(WORDS)
+    assert "world" in index and "mouse" not in index
+    assert index.ordinal("world") == 1 and index.ordinal("dog") == 1
+    assert index.ordinal("mouse") is None
+    assert index.lengths() == [3, 5]
+    assert len(index) == 6
+
+
+def test_random_words():
+    index = VocabularyIndex(WORDS)
+    assert index.random_word(5) in WORDS[5]
+    assert index.random_word(7) is None
+    words = index.random_words(5, 3)
+    assert len(set(words)) == 3 and set(words) <= set(WORDS[5])
+    assert sorted(index.random_words(3, 10)) == ["cat", "dog"]
+    assert index.random_words(7, 3) == []
+
+
+def test_load_vocabulary_replaces_index_and_tables():
+    load_vocabulary({6: ["planet", "rocket"]})
+    assert "rocket" in get_vocab_index()
+    table = get_word_table(6)
+    assert table.num_vocab == 2 and table.index["rocket"] == get_vocab_index().ordinal("rocket")
+
+
+def test_weighted_random_words():
+    index = VocabularyIndex({3: ["cat", "dog", "emu"]}, {3: [0, 1, 0]})
+    assert index.random_word(3) == "dog"
+    assert index.random_words(3, 3) == ["dog"]
+
+
+def test_equal_weights_sample_uniformly():
+    index = VocabularyIndex(WORDS, {5: [2, 2, 2, 2]})
+    assert not index.alias_tables
+    assert len(index.random_words(5, 4)) == 4
@@ -0,0 +1,57 @@
+import random
+from pathlib import Path
+
+import numpy as np
+import pytest
+from game_guess import compare_two_words, filter_by_history
+from word_mask import (
+    WordTable,
+    common_letter_hint_ids,
+    filter_by_history_ids,
+    letter_mask,
+)
+
+WORDS_FILE = Path(__file__).resolve().parent.parent / "alembic" / "vocab" / "words.txt"
+
+
+@pytest.fixture(scope="module")
+def table() -> WordTable:
+    table = WordTable(5)
+    table.add([w.strip() for w in WORDS_FILE.read_text().splitlines() if w.strip()])
+    return table
+
+
+def test_word_table_encoding(table):
+    ids = table.ids(["hello", "world", "hello"])
+    assert table.lookup(ids) == ["hello", "world"]
+    assert table.letters[ids[0]].tolist() == [7, 4, 11, 11, 14]
+    assert table.masks[ids[0]] == letter_mask("helo")
+    assert table.masks.nbytes + table.letters.nbytes == 9 * len(table)
+
+
+def test_word_table_adds_unseen_words():
+    table = WordTable(5)
+    first = table.ids(["hello", "world"])
+    second = table.ids(["world", "scare"])
+    assert first.tolist() == [0, 1]
+    assert second.tolist() == [1, 2]
+    with pytest.raises(ValueError):
+        table.add(["hi"])
+
+
+def test_filters_match_reference(table):
+    rng = random.Random(4)
+    candidates = rng.sample(table.words, 2000)
+    ids = table.ids(candidates)
+    for _ in range(30):
+        word, ref = rng.sample(table.words, 2)
+        hint, _ = compare_two_words(word, ref)
+        assert table.lookup(filter_by_history_ids(table, word, hint, ids)) == filter_by_history(
+            word, hint, candidates
+        )
+
+
+def test_common_letter_hint(table):
+    ids = table.ids(["panic", "fancy"])
+    assert common_letter_hint_ids("crazy", table, ids) == "?_?__"
+    assert common_letter_hint_ids("crazy", table, np.empty(0, dtype=np.int64)) == "?????"
@@ -0,0 +1,46 @@
+# Transposition table for host decisions.
+# Many games reach the same (candidate set, newest constraint, guess) state, e.g. every demo game
+# starts from DEFAULT_WORD_LIST, so a host rule's decision is memoized under a fingerprint of the
+# sorted candidate ids. Random decisions keep every alternative and pick one on each lookup, so
+# memoized games stay as random as computed ones.
+import hashlib
+import random
+import sys
+from collections.abc import Hashable
+from dataclasses import dataclass
+
+import numpy as np
+from config import TRANSPOSITION_ENTRIES, TRANSPOSITION_MAX_BYTES
+from src.hint_cache import BoundedCache
+
+
+@dataclass(frozen=True)
+class Decision:
+    """Possible (hint, new candidate ids) outcomes of a host rule, picked from uniformly."""
+
+    outcomes: tuple[tuple[str, np.ndarray], ...]
+
+    def pick(self) -> tuple[str, np.ndarray]:
+        if len(self.outcomes) == 1:
+            return self.outcomes[0]
+        return random.choice(self.outcomes)
+
+    def nbytes(self) -> int:
+        return sys.getsizeof(self.outcomes) + sum(
+            sys.getsizeof(hint) + ids.nbytes for hint, ids in self.outcomes
+        )
+
+
+def fingerprint(ids: np.ndarray) -> bytes:
+    """Stable hash of a candidate id set, independent of order."""
+    return hashlib.blake2b(np.sort(ids).astype("<i8").tobytes(), digest_size=16).digest()
+
+
+def decision_key(rule: str, table, ids: np.ndarray, guess: str, constraints) -> Hashable:
+    """Key of a decision. `constraints` are the history records the rule applies to `ids`."""
+    return (rule, table, fingerprint(ids), guess, tuple((r.word, r.hint) for r in constraints))
+
+
+transposition_table = BoundedCache(
+    TRANSPOSITION_ENTRIES, TRANSPOSITION_MAX_BYTES, sizeof=Decision.nbytes
+)
@@ -0,0 +1,261 @@
+# Import tools for the `vocabularies` table.
+# Usage (from server/):
+#   POSTGRES_URL=... PYTHONPATH=. python src/vocab_import.py words FILE [--prune]
+#   POSTGRES_URL=... PYTHONPATH=. python src/vocab_import.py weights FILE
+# `words` streams a word list through COPY into a temporary staging table and applies only the
+# difference to `vocabularies`: new words are appended after the last ordinal of their length, and
+# with --prune, words missing from the file are deleted, the ordinals of their lengths compacted
+# and the packed candidate sets of stored games re-encoded. Running servers keep word tables and
+# cached games packed by the old ordinals, so pruning refuses to run while any server is connected. A weights file has one "word weight"
+# pair per line (whitespace or comma separated), e.g. word frequencies. Both advance the
+# `vocabulary_version` sequence, and every worker of a running server reloads its vocabulary
+# within VOCABULARY_CHECK_SECONDS of seeing the new version.
+import argparse
+import io
+import logging
+import re
+import time
+from collections.abc import Iterable
+
+import sqlalchemy as sa
+from config import DB_APPLICATION_NAME, DB_URL
+from src.candidate_codec import pack_words, unpack_words
+from src.word_mask import WordTable
+
+log = logging.getLogger(__name__)
+
+WORD = re.compile(r"[a-z]+")
+STAGING = "vocab_staging"
+
+UPDATE_WEIGHTS = sa.text(
+    "UPDATE vocabularies v SET weight = w.weight"
+    " FROM unnest(CAST(:words AS text[]), CAST(:weights AS float8[])) AS w(word, weight)"
+    " WHERE v.word = w.word"
+)
+RESET_OTHER_WEIGHTS = sa.text(
+    "UPDATE vocabularies SET weight = :weight WHERE NOT (word = ANY(CAST(:words AS text[])))"
+)
+# held until commit: a server starting meanwhile waits for the pruned vocabulary
+LOCK_VOCABULARY = sa.text("LOCK TABLE vocabularies IN ACCESS EXCLUSIVE MODE")
+COUNT_SERVERS = sa.text("SELECT count(*) FROM pg_stat_activity WHERE application_name = :name")
+SELECT_REMOVED = sa.text(
+    f"SELECT v.word, v.length FROM vocabularies v"
+    f" WHERE NOT EXISTS (SELECT 1 FROM {STAGING} s WHERE s.word = v.word)"
+)
+DELETE_REMOVED = sa.text(
+    f"DELETE FROM vocabularies v WHERE NOT EXISTS (SELECT 1 FROM {STAGING} s WHERE s.word = v.word)"
+)
+# two passes through negative ordinals, the (length, ordinal) index is checked on every row
+COMPACT_ORDINALS = [
+    sa.text(
+        "UPDATE vocabularies v SET ordinal = -1 - o.ordinal FROM ("
+        "  SELECT id, row_number() OVER (PARTITION BY length ORDER BY ordinal) - 1 AS ordinal"
+        "  FROM vocabularies WHERE length = ANY(:lengths)"
+        ") o WHERE v.id = o.id"
+    ),
+    sa.text("UPDATE vocabularies SET ordinal = -1 - ordinal WHERE ordinal < 0"),
+]
+INSERT_ADDED = sa.text(
+    "INSERT INTO vocabularies (word, length, ordinal)"
+    " SELECT a.word, a.length,"
+    "  coalesce(m.last, -1) + row_number() OVER (PARTITION BY a.length ORDER BY a.word)"
+    f" FROM (SELECT DISTINCT s.word, length(s.word) AS length FROM {STAGING} s"
+    "  WHERE NOT EXISTS (SELECT 1 FROM vocabularies v WHERE v.word = s.word)) a"
+    " LEFT JOIN (SELECT length, max(ordinal) AS last FROM vocabularies GROUP BY length) m"
+    "  ON m.length = a.length"
+)
+# nextval is not transactional, so it runs after the import committed
+BUMP_VERSION = sa.text("SELECT nextval('vocabulary_version')")
+SELECT_WORDS = sa.text(
+    "SELECT length, word FROM vocabularies WHERE length = ANY(:lengths) ORDER BY length, ordinal"
+)
+SELECT_PACKED = {
+    "games": "SELECT id, answer, word_length FROM games WHERE word_length = ANY(:lengths)",
+    "game_history": (
+        "SELECT h.id, h.answer, g.word_length FROM game_history h JOIN games g ON g.id = h.game_id"
+        " WHERE g.word_length = ANY(:lengths)"
+    ),
+}
+
+
+class WordStream(io.RawIOBase):
+    """File-like COPY source of one normalized word per line, read lazily from `lines`.
+
+    Lines that are not a lowercase a-z word after stripping are skipped and counted.
+    """
+
+    def __init__(self, lines: Iterable[str]):
+        self._lines = iter(lines)
+        self._buf = bytearray()
+        self.words = 0
+        self.skipped = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while len(self._buf) < len(b):
+            line = next(self._lines, None)
+            if line is None:
+                break
+            word = line.strip().lower()
+            if not word:
+                continue
+            if not WORD.fullmatch(word):
+                self.skipped += 1
+                continue
+            self._buf += word.encode() + b"\n"
+            self.words += 1
+        n = min(len(b), len(self._buf))
+        b[:n] = self._buf[:n]
+        del self._buf[:n]
+        return n
+
+
+def stage_words(conn: sa.Connection, lines: Iterable[str]) -> WordStream:
+    """COPY `lines` into a staging table that lives until the end of the transaction."""
+    conn.execute(sa.text(f"CREATE TEMP TABLE {STAGING} (word text NOT NULL) ON COMMIT DROP"))
+    stream = WordStream(lines)
+    with conn.connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY {STAGING} (word) FROM STDIN", stream)
+    conn.execute(sa.text(f"CREATE INDEX ON {STAGING} (word)"))
+    conn.execute(sa.text(f"ANALYZE {STAGING}"))
+    return stream
+
+
+def load_tables(conn: sa.Connection, lengths: list[int]) -> dict[int, WordTable]:
+    words: dict[int, list[str]] = {length: [] for length in lengths}
+    for length, word in conn.execute(SELECT_WORDS, {"lengths": lengths}):
+        words[length].append(word)
+    return {length: WordTable(length, w) for length, w in words.items()}
+
+
+def repack_answers(
+    conn: sa.Connection, old: dict[int, WordTable], new: dict[int, WordTable]
+) -> int:
+    """Re-encode stored candidate sets of the lengths whose ordinals changed."""
+    lengths = list(old)
+    count = 0
+    for name, query in SELECT_PACKED.items():
+        rows = conn.execute(sa.text(query), {"lengths": lengths}).fetchall()
+        updates = [
+            {
+                "id": row.id,
+                "answer": pack_words(
+                    new[row.word_length], unpack_words(old[row.word_length], row.answer)
+                ),
+            }
+            for row in rows
+        ]
+        if updates:
+            conn.execute(sa.text(f"UPDATE {name} SET answer = :answer WHERE id = :id"), updates)
+        count += len(updates)
+    return count
+
+
+def check_no_servers(conn: sa.Connection) -> None:
+    """Raise while server connections exist, their in-memory ordinals would go stale."""
+    servers = conn.execute(COUNT_SERVERS, {"name": DB_APPLICATION_NAME}).scalar_one()
+    if servers:
+        raise RuntimeError(
+            f"{servers} {DB_APPLICATION_NAME} connections are open, stop the servers to prune"
+        )
+
+
+def import_words(conn: sa.Connection, lines: Iterable[str], prune: bool = False) -> dict:
+    """Apply the word list `lines` to `vocabularies`, returning counts and phase timings."""
+    timings: dict[str, float] = {}
+    last = time.perf_counter()
+
+    def lap(phase: str) -> None:
+        nonlocal last
+        now = time.perf_counter()
+        timings[phase] = now - last
+        last = now
+
+    stream = stage_words(conn, lines)
+    lap("copy")
+
+    removed = []
+    repacked = 0
+    if prune:
+        conn.execute(LOCK_VOCABULARY)
+        check_no_servers(conn)
+        removed = conn.execute(SELECT_REMOVED).fetchall()
+        lengths = sorted({row.length for row in removed})
+        if lengths:
+            old = load_tables(conn, lengths)
+            conn.execute(DELETE_REMOVED)
+            for statement in COMPACT_ORDINALS:
+                conn.execute(statement, {"lengths": lengths})
+            repacked = repack_answers(conn, old, load_tables(conn, lengths))
+        lap("prune")
+
+    added = conn.execute(INSERT_ADDED).rowcount
+    lap("insert")
+    return {
+        "words": stream.words,
+        "skipped": stream.skipped,
+        "added": added,
+        "removed": len(removed),
+        "repacked": repacked,
+        "seconds": timings,
+    }
+
+
+def parse_weights(lines: Iterable[str]) -> dict[str, float]:
+    weights: dict[str, float] = {}
+    for number, line in enumerate(lines, 1):
+        fields = re.split(r"[\s,]+", line.strip())
+        if not fields[0]:
+            continue
+        if len(fields) != 2:
+            raise ValueError(f"line {number}: expected 'word weight', got {line.strip()!r}")
+        weight = float(fields[1])
+        if weight < 0:
+            raise ValueError(f"line {number}: weight must not be negative")
+        weights[fields[0].lower()] = weight
+    return weights
+
+
+def import_weights(
+    conn: sa.Connection, weights: dict[str, float], default: float | None = None
+) -> int:
+    """Set the weight of every listed word in one statement, `default` for the other words."""
+    words = list(weights)
+    if default is not None:
+        conn.execute(RESET_OTHER_WEIGHTS, {"weight": default, "words": words})
+    result = conn.execute(UPDATE_WEIGHTS, {"words": words, "weights": list(weights.values())})
+    return result.rowcount
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Import data into the vocabularies table")
+    commands = parser.add_subparsers(dest="command", required=True)
+    words_parser = commands.add_parser("words", help="sync the vocabulary with a word list")
+    words_parser.add_argument("file")
+    words_parser.add_argument(
+        "--prune", action="store_true", help="delete words that are not in the file"
+    )
+    weights_parser = commands.add_parser("weights", help="set word weights from a file")
+    weights_parser.add_argument("file")
+    weights_parser.add_argument(
+        "--default", type=float, help="weight of words missing from the file (default: unchanged)"
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    engine = sa.create_engine(DB_URL)
+    with open(args.file) as f, engine.begin() as conn:
+        if args.command == "words":
+            report = import_words(conn, f, args.prune)
+            log.info(f"Imported {args.file}: {report}")
+        else:
+            weights = parse_weights(f)
+            updated = import_weights(conn, weights, args.default)
+            log.info(f"Updated {updated} of {len(weights)} weights")
+    with engine.begin() as conn:
+        version = conn.execute(BUMP_VERSION).scalar_one()
+    log.info(f"Vocabulary version {version}, running workers reload it")
+    log.info(f"Done in {time.perf_counter() - start:.2f}s")
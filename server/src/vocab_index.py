@@ -0,0 +1,109 @@
+# In-process index of the `vocabularies` table.
+# Loaded once at startup (and on reload) so the hot endpoints validate guesses, list lengths and
+# pick random words from memory instead of querying the database. Words are interned and kept per
+# length in ordinal order, matching the word table ids. Lengths whose words carry different weights
+# get an alias table at load time, so weighted answer sampling stays O(1) per word.
+import random
+import sys
+import threading
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+from src.constraint_index import PositionalIndex
+from src.sampling import AliasTable, sample_distinct
+from src.word_mask import load_word_tables
+
+
+class VocabularyIndex:
+    """Length-bucketed vocabulary: word lists in ordinal order plus a word -> ordinal map.
+
+    `weights_by_length` are the word weights in the same order; random words are drawn
+    proportionally to them. Without weights, or with equal ones, sampling is uniform.
+    """
+
+    def __init__(
+        self,
+        words_by_length: Mapping[int, Sequence[str]] | None = None,
+        weights_by_length: Mapping[int, Sequence[float]] | None = None,
+    ):
+        self.words: dict[int, list[str]] = {}
+        self.ordinals: dict[str, int] = {}
+        self.alias_tables: dict[int, AliasTable] = {}
+        self._constraint_indexes: dict[int, PositionalIndex] = {}
+        for length, words in (words_by_length or {}).items():
+            words = [sys.intern(w) for w in words]
+            self.words[length] = words
+            self.ordinals.update((w, i) for i, w in enumerate(words))
+            weights = (weights_by_length or {}).get(length)
+            if weights is not None and len(set(weights)) > 1:
+                if len(weights) != len(words):
+                    raise ValueError(f"Expected {len(words)} weights for length {length}")
+                self.alias_tables[length] = AliasTable(weights)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.ordinals
+
+    def __len__(self) -> int:
+        return len(self.ordinals)
+
+    def ordinal(self, word: str) -> int | None:
+        return self.ordinals.get(word)
+
+    def lengths(self) -> list[int]:
+        return sorted(length for length, words in self.words.items() if words)
+
+    def random_word(self, length: int) -> str | None:
+        words = self.words.get(length)
+        if not words:
+            return None
+        alias = self.alias_tables.get(length)
+        return words[alias.draw()] if alias is not None else random.choice(words)
+
+    def random_words(self, length: int, count: int) -> list[str]:
+        """Up to `count` distinct random words of `length`."""
+        words = self.words.get(length, [])
+        alias = self.alias_tables.get(length)
+        if alias is not None:
+            return [words[i] for i in alias.sample_distinct(count)]
+        return [words[i] for i in sample_distinct(len(words), count)]
+
+    def constraint_index(self, length: int) -> PositionalIndex:
+        """Positional index of the words of `length`, built on first use."""
+        index = self._constraint_indexes.get(length)
+        if index is None:
+            index = PositionalIndex(self.words.get(length, []), length)
+            index = self._constraint_indexes.setdefault(length, index)
+        return index
+
+    def matching_ordinals(self, length: int, maps: Mapping[str, str]) -> np.ndarray:
+        """Ordinals of the words of `length` consistent with every (word, hint) in `maps`."""
+        return self.constraint_index(length).ids(maps)
+
+    def random_matching_words(self, length: int, maps: Mapping[str, str], count: int) -> list[str]:
+        words = self.words.get(length, [])
+        ordinals = self.matching_ordinals(length, maps)
+        return [words[ordinals[i]] for i in sample_distinct(len(ordinals), count)]
+
+
+_index = VocabularyIndex()
+_lock = threading.Lock()
+
+
+def get_vocab_index() -> VocabularyIndex:
+    return _index
+
+
+def load_vocabulary(
+    words_by_length: Mapping[int, Sequence[str]],
+    weights_by_length: Mapping[int, Sequence[float]] | None = None,
+) -> VocabularyIndex:
+    """Replace the vocabulary index and word tables, given per length in ordinal order.
+
+    The index is swapped in one assignment, so readers see either the old or the new vocabulary.
+    """
+    global _index
+    index = VocabularyIndex(words_by_length, weights_by_length)
+    with _lock:
+        load_word_tables(words_by_length)
+        _index = index
+    return index
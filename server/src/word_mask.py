@@ -0,0 +1,139 @@
+# Compact word representation for candidate filtering.
+# Every word gets a vocabulary id, a 26-bit letter-presence mask and one letter code (0-25) per
+# position, computed once when the word is first seen. Filters take and return arrays of ids, so
+# a candidate costs 4 bytes of mask plus one byte per letter instead of a Python string.
+import threading
+from collections.abc import Iterable, Mapping, Sequence
+
+import numpy as np
+from src.engine import HIT, MISS, PRESENT, decode_hints, encode_hint
+
+ALPHABET = 26
+FIRST_LETTER = ord("a")
+
+
+def encode_letters(words: Sequence[str]) -> np.ndarray:
+    """(N, L) uint8 letter codes, 0 for "a" to 25 for "z"."""
+    buf = np.frombuffer("".join(words).encode("ascii"), dtype=np.uint8) - FIRST_LETTER
+    if buf.size and buf.max() >= ALPHABET:
+        raise ValueError("Words must only contain lowercase letters a-z")
+    return buf.reshape(len(words), -1)
+
+
+def letter_masks(letters: np.ndarray) -> np.ndarray:
+    """(N,) uint32 masks with bit `c` set when letter code `c` appears in the word."""
+    bits = np.left_shift(np.uint32(1), letters.astype(np.uint32))
+    return np.bitwise_or.reduce(bits, axis=1)
+
+
+def letter_mask(letters: Iterable[str]) -> int:
+    mask = 0
+    for c in letters:
+        mask |= 1 << (ord(c) - FIRST_LETTER)
+    return mask
+
+
+class WordTable:
+    """Append-only table of encoded words of one length. Ids never change once assigned.
+
+    The table starts with `vocabulary` in ordinal order, so ids below `num_vocab` are the
+    `vocabularies.ordinal` of the word and can be persisted. Words added later get process-local
+    ids.
+    """
+
+    def __init__(self, length: int, vocabulary: Sequence[str] = ()):
+        self.length = length
+        self.words: list[str] = []
+        self.index: dict[str, int] = {}
+        self.letters = np.empty((0, length), dtype=np.uint8)
+        self.masks = np.empty(0, dtype=np.uint32)
+        self._lock = threading.Lock()
+        self.add(vocabulary)
+        self.num_vocab = len(self.words)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def add(self, words: Sequence[str]) -> None:
+        with self._lock:
+            new = [w for w in dict.fromkeys(words) if w not in self.index]
+            if not new:
+                return
+            if any(len(w) != self.length for w in new):
+                raise ValueError(f"Words must have length {self.length}")
+            letters = encode_letters(new)
+            start = len(self.words)
+            self.index.update((w, start + i) for i, w in enumerate(new))
+            self.words.extend(new)
+            self.letters = np.concatenate([self.letters, letters])
+            self.masks = np.concatenate([self.masks, letter_masks(letters)])
+
+    def ids(self, words: Sequence[str]) -> np.ndarray:
+        """Ids of `words` in order, without duplicates, adding unseen words to the table."""
+        words = list(dict.fromkeys(words))
+        if any(w not in self.index for w in words):
+            self.add(words)
+        return np.fromiter((self.index[w] for w in words), dtype=np.int64, count=len(words))
+
+    def lookup(self, ids: np.ndarray) -> list[str]:
+        return [self.words[i] for i in ids]
+
+
+_tables: dict[int, WordTable] = {}
+
+
+def get_word_table(length: int) -> WordTable:
+    table = _tables.get(length)
+    if table is None:
+        table = _tables.setdefault(length, WordTable(length))
+    return table
+
+
+def load_word_tables(vocabulary: Mapping[int, Sequence[str]]) -> None:
+    """Replace the word tables by the vocabulary, given per length in ordinal order."""
+    for length, words in vocabulary.items():
+        _tables[length] = WordTable(length, words)
+
+
+def vocabulary_words() -> dict[int, list[str]]:
+    """The vocabulary part of every word table, what `load_word_tables` rebuilds them from."""
+    return {length: table.words[: table.num_vocab] for length, table in _tables.items()}
+
+
+def filter_by_history_ids(table: WordTable, word: str, hint: str, ids: np.ndarray) -> np.ndarray:
+    """Id-array equivalent of `filter_by_history(word, hint, candidates)`."""
+    h = encode_hint(hint)
+    keep = table.index.get(word, -1) != ids
+    missed = letter_mask(word[i] for i in np.flatnonzero(h == MISS))
+    if missed:
+        keep &= (table.masks[ids] & missed) == 0
+    present = np.flatnonzero(h == PRESENT)
+    if present.size:
+        w = encode_letters([word])[0]
+        keep &= ~(table.letters[ids[:, None], present] == w[present]).any(axis=1)
+    return ids[keep]
+
+
+def refine_by_highest_ids(
+    guess: str, codes: np.ndarray, scores: np.ndarray, table: WordTable, ids: np.ndarray
+) -> np.ndarray:
+    """Keep-mask over `ids` for the "highest scoring words" step of the cheating host.
+
+    The reference intersects `filter_candidates(top, hint)` over every top scoring word. That
+    drops the top words themselves plus every word containing a guess letter that is a HIT for
+    any top word, so it collapses into one mask.
+    """
+    top = scores == scores.max()
+    keep = ~top
+    hit_positions = np.flatnonzero((codes[top] == HIT).any(axis=0))
+    hits = letter_mask(guess[i] for i in hit_positions)
+    if hits:
+        keep &= (table.masks[ids] & hits) == 0
+    return keep
+
+
+def common_letter_hint_ids(guess: str, table: WordTable, ids: np.ndarray) -> str:
+    """PRESENT for every guess letter that all candidates contain, MISS otherwise."""
+    shared = np.bitwise_and.reduce(table.masks[ids]) if ids.size else (1 << ALPHABET) - 1
+    codes = [PRESENT if shared >> (ord(c) - FIRST_LETTER) & 1 else MISS for c in guess]
+    return decode_hints(np.array([codes], dtype=np.uint8))[0]
@@ -2,16 +2,23 @@ import logging
 import random
 from uuid import UUID
 
-from config import DEFAULT_LEN_WORD, DEFAULT_MAX_ATTEMPTS, DEFAULT_WORD_LIST, ENV  # noqa
+from config import DEFAULT_LEN_WORD, DEFAULT_MAX_ATTEMPTS, DEFAULT_WORD_LIST, ENV, HostRule  # noqa
 from fastapi import APIRouter, Depends, HTTPException
+from middleware.custom_logging import SAMPLED
+from middleware.timing import phase
 from models.game import Game as GameModel
 from models.game_history import GameHistory
+from models.game_state import GameState, game_cache
+from models.history_writer import history_writer
 from models.session import get_db_session
 from models.user import User as UserModel
 from models.vocab import Vocabulary as VocabModel
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
+from src.candidate_codec import pack_ids, pack_words, unpack_ids, unpack_words
+from src.executor import HistoryRecord, host_executor
 from src.game_guess import (  # noqa
+    HOST_RULES,
     Hint,
     compare_two_words,
     filter_by_history,
@@ -20,6 +27,8 @@ from src.game_guess import (  # noqa
     get_lowest_words,
     update_candidate_by_host_cheating_rule,
 )
+from src.vocab_index import get_vocab_index
+from src.word_mask import get_word_table
 
 log = logging.getLogger(__name__)
 
@@ -60,6 +69,7 @@ class NewGameReq(BaseModel):
     num_attempts: int | None = None
     word_length: int | None = None
     mode: str = "hard"
+    host_rule: str = HostRule.CHEATING.value
 
 
 class GetGameHistoryResp(NewGameResp):
@@ -68,12 +78,10 @@ class GetGameHistoryResp(NewGameResp):
 
 
 @router.get("/word_lengths")
-async def get_all_word_lengths(
-    db: AsyncSession = Depends(get_db_session),
-) -> list[int]:
+async def get_all_word_lengths() -> list[int]:
     if ENV in ["demo", "dev"]:
         return [DEFAULT_LEN_WORD]
-    return await VocabModel.get_all_word_lengths(db)
+    return get_vocab_index().lengths()
 
 
 @router.get("/new", response_model=NewGameResp)
@@ -94,36 +102,41 @@ async def new_game(
     if not req.word_length or req.word_length < 1:
         req.word_length = DEFAULT_LEN_WORD
 
+    if req.host_rule not in HOST_RULES:
+        raise HTTPException(status_code=400, detail="Invalid host rule")
+
     if req.mode != "hard":
         # Get a single word
-        vocab = await VocabModel.get_random_word(db, req.word_length)
-        candidates = [vocab.word] if vocab else []
+        word = get_vocab_index().random_word(req.word_length)
+        candidates = [word] if word else []
 
         # for demo and testing
         if ENV in ["demo", "dev"]:
             candidates = [VocabModel.get_random_word_from_list(DEFAULT_WORD_LIST)]
     else:
         # Get multiple words
-        words = await VocabModel.get_random_words(db, req.word_length, max(req.num_attempts - 2, 5))
-        candidates = [w.word for w in words]
+        count = max(req.num_attempts - 2, 5)
+        candidates = get_vocab_index().random_words(req.word_length, count)
 
         # for demo and testing
         if ENV in ["demo", "dev"]:
             candidates = list(DEFAULT_WORD_LIST)
 
-    log.debug(f"{candidates=}")
+    log.debug("candidates=%s", candidates, extra=SAMPLED)
     if not candidates or len(candidates[0]) != req.word_length:
         raise HTTPException(status_code=500, detail="No words found")
 
-    candidates = ",".join(candidates)
     game = await GameModel.create(
         db,
         user_id=user.id,
-        answer=candidates,
+        answer=pack_words(get_word_table(req.word_length), candidates),
         max_rounds=req.num_attempts,
         word_length=req.word_length,
+        host_rule=req.host_rule,
     )
+    # formatted here, the listener thread must not touch ORM objects
     log.info(f"New game created: {game}")
+    game_cache.put(GameState.from_game(game, [], game.answer))
     return game
 
 
@@ -135,52 +148,71 @@ async def submit_guess(
 ):
     # Validate guess and game status
     guess = guess.lower()
-    game = await GameModel.get(db, id)
+    with phase("game"):
+        game = await game_cache.get(db, id)
     if game is None:
         raise HTTPException(status_code=404, detail="Game not found")
 
     if game.num_attempts >= game.max_rounds or game.is_end:
         raise HTTPException(status_code=400, detail="Game is over")
 
-    vocab = await VocabModel.get(db, guess)
-    if vocab is None:
+    with phase("vocab"):
+        valid = guess in get_vocab_index()
+    if not valid:
         raise HTTPException(status_code=400, detail="Not a valid word")
 
-    history = await GameHistory.get_by_game_id(db, game.id)
-    last_history = history[-1] if history else None
-    candidates = []
-    if last_history is None:
-        candidates: list[str] = game.answer.split(",")
-    else:
-        candidates: list[str] = last_history.answer.split(",")
-    log.debug(f"current: {candidates=} {guess=}")
-
-    if len(guess) != len(candidates[0]):
+    if len(guess) != game.word_length:
         raise HTTPException(status_code=400, detail="Invalid guess length")
 
-    hint, candidates = update_candidate_by_host_cheating_rule(history, guess, candidates)
+    table = get_word_table(game.word_length)
+    with phase("unpack"):
+        ids = unpack_ids(table, game.answer)
+    log.debug("current: %d candidates guess=%s", len(ids), guess)
+
+    # candidates of the last submit already satisfy every earlier hint, only apply the newest
+    try:
+        with phase("host"):
+            hint, ids = await host_executor.run(
+                game.host_rule, game.history, guess, game.word_length, ids, replay=False
+            )
+    except TimeoutError:
+        raise HTTPException(status_code=503, detail="Host is busy, please retry")
 
     # Update game status
-    history = GameHistory(game_id=game.id, word=guess, answer=",".join(candidates))
-    history.hint = hint
-    history.hit_count = hint.count(Hint.HIT.value)
-    history.present_count = hint.count(Hint.PRESENT.value)
-    history.miss_count = hint.count(Hint.MISS.value)
+    attempt = len(game.history) + 1
+    record = GameHistory.from_hint(game.id, attempt, guess, hint, pack_ids(table, ids))
+    if not history_writer.enabled:
+        db.add(record)
 
     answer_to_player = ""
-    if hint == Hint.HIT.value * len(candidates[0]):
+    if hint == Hint.HIT.value * game.word_length:
         game.is_end = True
-        answer_to_player = candidates[0]
+        answer_to_player = table.words[ids[0]]
 
     if not game.is_end:
         game.num_attempts += 1
         if game.num_attempts >= game.max_rounds:
             game.is_end = True
-            answer_to_player = random.choice(candidates)
-
-    history.answer = ",".join(candidates)
-    await db.commit()
-    await history.insert(db)
+            answer_to_player = table.words[random.choice(ids)]
+
+    # game update and history insert in one transaction, nothing is read back
+    # (only the game update when history is written behind)
+    with phase("commit"):
+        await GameModel.update_progress(db, game.id, game.num_attempts, game.is_end)
+        await db.commit()
+    if history_writer.enabled:
+        # queued only once the game update is committed, a failed update leaves no row behind;
+        # a failed "group" flush leaves the game one attempt ahead, so it is reloaded next time
+        try:
+            with phase("history"):
+                await history_writer.add(record)
+        except Exception:
+            game_cache.invalidate(game.id)
+            raise
+    game.history.append(HistoryRecord(guess, hint))
+    game.answer = record.answer
+    with phase("cache"):
+        game_cache.put(game)
 
     return GuessResp(
         id=game.id,
@@ -199,28 +231,26 @@ async def get_game(
     id: str,
     db: AsyncSession = Depends(get_db_session),
 ):
-    game = await GameModel.get(db, id)
+    game = await game_cache.get(db, id)
     if game is None:
         raise HTTPException(status_code=404, detail="Game not found")
 
-    history = await GameHistory.get_by_game_id(db, game.id)
-    if history is None:
-        history = GameHistory(game_id=game.id, word=game.answer, answer="")
-
     history_list = []
-    for h in history:
+    for h in game.history:
         history_list.append(GameHistoryItem(word=h.word, hint=h.hint))
 
     # Not display answer if game is not ended
-    game_dict = game.__dict__
-    game_dict.pop("answer")
+    answer = ""
     if game.is_end:
-        answer = history[-1].answer
-        if "," in answer:
-            answer = random.choice(answer.split(","))
-        game_dict["answer"] = history[-1].answer
+        answer = ",".join(unpack_words(get_word_table(game.word_length), game.answer))
 
     return GetGameHistoryResp(
-        **game_dict,
+        id=game.id,
+        user_id=game.user_id,
+        max_rounds=game.max_rounds,
+        num_attempts=game.num_attempts,
+        word_length=game.word_length,
+        is_end=game.is_end,
+        answer=answer,
         history=history_list,
     )